@@ -0,0 +1,242 @@
+"""
+Benchmark of the slide puzzle solver - runs every instance of the chosen sets with every heuristic and search mode and prints
+one JSON line per run followed by one summary line per configuration.
+
+Run it from the root directory:
+
+    python -m homework_01.benchmark --sets random-8 random-walk-15 --heuristics manhattan pattern-database
+
+Instances from a file (one board per line, for example Korf's 100 15-puzzles with `--zero-index 0`) are added with `--instances`.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from homework_01.solution import (
+    HEURISTICS,
+    Heuristics,
+    InvalidBoardError,
+    MatrixHelper,
+    PatternDatabase,
+    SearchMode,
+    SearchStats,
+    SearchTimeoutError,
+    get_heuristic,
+    get_puzzle,
+    read_boards,
+    solution,
+)
+
+SEED = 2021
+
+
+class InstanceSets:
+    # Uniformly random solvable 8-puzzles
+    random_8 = 'random-8'
+    # 15-puzzles scrambled with a random walk of the zero, which keeps them solvable in seconds
+    random_walk_15 = 'random-walk-15'
+
+
+def generate_random_boards(length: int, count: int, seed: int = SEED) -> list:
+    """
+    Generates `count` random solvable boards with `length` cells (the default expected zero position is assumed)
+    """
+    generator = random.Random(seed)
+    boards = []
+
+    while len(boards) < count:
+        numbers = list(range(length))
+        generator.shuffle(numbers)
+
+        try:
+            MatrixHelper(numbers).validate_board(length - 1)
+        except InvalidBoardError:
+            continue
+
+        boards.append(numbers)
+
+    return boards
+
+
+def generate_random_walk_boards(length: int, count: int, walk_length: int, seed: int = SEED) -> list:
+    """
+    Generates `count` boards by moving the zero `walk_length` times from the ordered board, never straight back
+    """
+    generator = random.Random(seed)
+    puzzle = get_puzzle(length, length - 1)
+    boards = []
+
+    for _ in range(count):
+        board = puzzle.goal.copy()
+        zero_position = length - 1
+        previous_zero_position = -1
+
+        for _ in range(walk_length):
+            # Never undo the previous move, so that the walk does not cancel itself out
+            positions = [position for _, position in puzzle.moves[zero_position] if position != previous_zero_position]
+            moved_zero_position = generator.choice(positions)
+            board[zero_position], board[moved_zero_position] = board[moved_zero_position], 0
+            previous_zero_position, zero_position = zero_position, moved_zero_position
+
+        boards.append(board)
+
+    return boards
+
+
+def get_instances(sets: list, count: int, walk_length: int, instances_path: str = None, expected_zero_index: int = -1) -> list:
+    """
+    Lines of `instances_path` which are not boards are skipped with a warning, the other boards keep the index of their line
+
+    :return: list of (set name, index in the set, board, expected zero index)
+    """
+    instances = []
+
+    for name in sets:
+        if name == InstanceSets.random_8:
+            boards = generate_random_boards(9, count)
+        elif name == InstanceSets.random_walk_15:
+            boards = generate_random_walk_boards(16, count, walk_length)
+        else:
+            raise ValueError(f"Unknown instance set {name}")
+
+        instances += [(name, index, board, -1) for index, board in enumerate(boards)]
+
+    if instances_path:
+        with open(instances_path, "r") as fd:
+            for index, board in enumerate(read_boards(fd)):
+                if isinstance(board, InvalidBoardError):
+                    # The line is not a board at all, so there is nothing to run
+                    print(f"Skipping instance {index} of {instances_path}: {board}", file=sys.stderr)
+                    continue
+
+                instances.append((instances_path, index, board, expected_zero_index))
+
+    return instances
+
+
+def prepare_heuristic(heuristic: str, length: int, expected_zero_index: int):
+    """
+    Builds the heuristic tables before the runs, so that building them is not measured as solving time
+    """
+    expected_zero_position = length - 1 if expected_zero_index == -1 else expected_zero_index
+    puzzle = get_puzzle(length, expected_zero_position)
+
+    if heuristic == Heuristics.pattern_database:
+        PatternDatabase.for_puzzle(puzzle)
+
+    get_heuristic(heuristic, length, expected_zero_position)
+
+
+def run(board: list, expected_zero_index: int, heuristic: str, mode: str, timeout: float, measure_memory: bool) -> dict:
+    result = {}
+    stats = SearchStats()
+
+    start = time.perf_counter()
+    try:
+        distance, _ = solution(len(board) - 1, expected_zero_index, board, mode=mode, heuristic=heuristic, timeout=timeout, stats=stats)
+    except SearchTimeoutError:
+        distance = None
+        result.update(error="timeout")
+    except InvalidBoardError as error:
+        distance = None
+        result.update(error=str(error))
+    elapsed = time.perf_counter() - start
+
+    result.update(
+        distance=distance,
+        expanded=stats.expanded,
+        generated=stats.generated,
+        branching_factor=stats.branching_factor,
+        max_depth=stats.max_depth,
+        thresholds=stats.thresholds,
+        time=elapsed,
+        nodes_per_second=stats.expanded / elapsed if elapsed > 0 else None,
+        peak_memory=None,
+    )
+
+    # Tracing the allocations slows the search down, so the memory is measured in a separate run
+    if measure_memory and distance is not None:
+        tracemalloc.start()
+        try:
+            solution(len(board) - 1, expected_zero_index, board, mode=mode, heuristic=heuristic, timeout=timeout)
+        except SearchTimeoutError:
+            pass
+        result.update(peak_memory=tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    return result
+
+
+def summarize(runs: list) -> dict:
+    solved = [run for run in runs if run["distance"] is not None]
+    expanded = sum([run["expanded"] for run in solved])
+    elapsed = sum([run["time"] for run in solved])
+    peak_memories = [run["peak_memory"] for run in solved if run["peak_memory"] is not None]
+
+    return {
+        "instances": len(runs),
+        "solved": len(solved),
+        "expanded": expanded,
+        "time": elapsed,
+        "nodes_per_second": expanded / elapsed if elapsed > 0 else None,
+        "peak_memory": max(peak_memories, default=None),
+    }
+
+
+def benchmark(
+        instances: list,
+        heuristics: list,
+        modes: list,
+        timeout: float = None,
+        measure_memory: bool = True,
+):
+    """
+    Yields a dictionary for every run and a summary for every (instance set, heuristic, mode) after its last run
+    """
+    for heuristic in heuristics:
+        for mode in modes:
+            if mode == SearchMode.tree and heuristic != Heuristics.manhattan:
+                # The tree search has its own heuristic, so it is measured only once
+                continue
+
+            runs_per_set = {}
+
+            for set_name, index, board, expected_zero_index in instances:
+                if mode == SearchMode.tree and len(board) > 9:
+                    # The tree keeps every generated node, which does not fit in memory for the bigger boards
+                    continue
+
+                prepare_heuristic(heuristic, len(board), expected_zero_index)
+                result = run(board, expected_zero_index, heuristic, mode, timeout, measure_memory)
+                result = {"type": "run", "set": set_name, "index": index, "heuristic": heuristic, "mode": mode, **result}
+                runs_per_set.setdefault(set_name, []).append(result)
+
+                yield result
+
+            for set_name, runs in runs_per_set.items():
+                yield {"type": "summary", "set": set_name, "heuristic": heuristic, "mode": mode, **summarize(runs)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks the slide puzzle solver and prints JSON lines")
+    parser.add_argument("--sets", nargs="*", choices=[InstanceSets.random_8, InstanceSets.random_walk_15], default=[InstanceSets.random_8])
+    parser.add_argument("--instances", metavar="PATH", help="additional boards, one per line")
+    parser.add_argument("--zero-index", type=int, default=-1, help="expected zero index of the boards from --instances")
+    parser.add_argument("--count", type=int, default=100, help="instances per generated set")
+    parser.add_argument("--walk-length", type=int, default=60, help="moves of the random walk for the 15-puzzles")
+    parser.add_argument("--heuristics", nargs="+", choices=list(HEURISTICS), default=list(HEURISTICS))
+    parser.add_argument("--modes", nargs="+", choices=[SearchMode.path, SearchMode.parallel, SearchMode.tree], default=[SearchMode.path])
+    parser.add_argument("--timeout", type=float, default=None, help="seconds per run")
+    parser.add_argument("--no-memory", action="store_true", help="skip the (slower) peak memory measurement")
+    args = parser.parse_args()
+
+    instances = get_instances(args.sets, args.count, args.walk_length, args.instances, args.zero_index)
+    for result in benchmark(instances, args.heuristics, args.modes, args.timeout, not args.no_memory):
+        print(json.dumps(result), flush=True)
+
+
+if __name__ == '__main__':
+    main()
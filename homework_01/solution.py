@@ -1,7 +1,20 @@
+import argparse
 import json
 import math
+import mmap
+import multiprocessing
+import os
+import pathlib
+import struct
+import sys
 import time
-from functools import cached_property
+from array import array
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from functools import lru_cache
+from operator import itemgetter
+
+DATA_PATH = os.path.join(pathlib.Path(__file__).parent.resolve(), "data")
 
 
 class Turn:
@@ -11,11 +24,6 @@ class Turn:
     down = 'down'
 
 
-def swap(l: list, source: int, destination: int):
-    l[source], l[destination] = l[destination], l[source]
-    return l
-
-
 def get_number_of_inversions_without_zero(l: list):
     inversions_count = 0
     length = len(l)
@@ -28,6 +36,31 @@ def get_number_of_inversions_without_zero(l: list):
     return inversions_count
 
 
+def validate_numbers(numbers: list, expected_zero_position: int):
+    """
+    Raises `InvalidBoardError` when the numbers can not make a board - the searches expect a square board with every number from
+    0 to N exactly once, anything else would never reach the goal
+    """
+    length = len(numbers)
+    side_length = int(length ** 0.5)
+
+    if length == 0 or side_length * side_length != length:
+        raise InvalidBoardError(f"The board must be a square, not {length} numbers")
+    if sorted(numbers) != list(range(length)):
+        raise InvalidBoardError(f"The board must have every number from 0 to {length - 1} exactly once")
+    if not 0 <= expected_zero_position < length:
+        raise InvalidBoardError(f"The expected zero index {expected_zero_position} is out of the board")
+
+
+class SearchMode:
+    # Keeps every generated node in a `Tree` (memory grows with the number of generated nodes)
+    tree = 'tree'
+    # Keeps only the current path and moves the zero in place (memory grows with the depth of the solution)
+    path = 'path'
+    # The path search split between worker processes (see `parallel_iterative_deepening_a_star`)
+    parallel = 'parallel'
+
+
 class InvalidBoardError(Exception):
     """
     Thrown when the board is invalid
@@ -35,12 +68,182 @@ class InvalidBoardError(Exception):
     pass
 
 
+class SearchTimeoutError(Exception):
+    """
+    Thrown when the search does not finish before its deadline
+    """
+    pass
+
+
+class SearchCancelledError(Exception):
+    """
+    Thrown when the search is stopped from outside, e.g. when another worker already found the solution
+    """
+    pass
+
+
+class IterationStats:
+    """
+    The work done by a single threshold iteration of IDA*
+    """
+
+    def __init__(self, threshold: int):
+        self.threshold = threshold
+        # Boards whose successors were generated and the successors themselves
+        self.expanded = 0
+        self.generated = 0
+        # The most moves from the start board reached in the iteration
+        self.max_depth = 0
+        # Seconds spent in the heuristic (only with `SearchStats.time_heuristic`) and in the whole iteration
+        self.heuristic_time = 0.0
+        self.time = 0.0
+
+    @property
+    def branching_factor(self) -> float:
+        return self.generated / self.expanded if self.expanded else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "threshold": self.threshold,
+            "expanded": self.expanded,
+            "generated": self.generated,
+            "branching_factor": self.branching_factor,
+            "max_depth": self.max_depth,
+            "heuristic_time": self.heuristic_time,
+            "time": self.time,
+        }
+
+
+class SearchStats:
+    """
+    Counters filled by the searches when they are given a `stats` object. Nothing is counted without it.
+
+    The searches add their work to the totals with `count` and mark the threshold iterations with `start_iteration` and
+    `finish_iteration`, which appends an `IterationStats` to `iterations` and passes it to `observer` (when given).
+    Timing the heuristic wraps it in `TimedHeuristic`, which is noticeable, so it is enabled separately with `time_heuristic`.
+    """
+
+    def __init__(self, time_heuristic: bool = False, observer=None):
+        self.time_heuristic = time_heuristic
+        self.observer = observer
+
+        self.expanded = 0
+        self.generated = 0
+        self.max_depth = 0
+        self.heuristic_time = 0.0
+        self.iterations = []
+
+        self.__current = None
+        self.__current_start = None
+
+    def count(self, expanded: int, generated: int, max_depth: int):
+        self.expanded += expanded
+        self.generated += generated
+        if max_depth > self.max_depth:
+            self.max_depth = max_depth
+
+        if self.__current is not None and max_depth > self.__current.max_depth:
+            self.__current.max_depth = max_depth
+
+    def merge(self, other):
+        """
+        Adds the totals of `other` (e.g. the stats of a worker process) to the totals of this object
+        """
+        self.count(other.expanded, other.generated, other.max_depth)
+        self.heuristic_time += other.heuristic_time
+
+    def start_iteration(self, threshold: int):
+        self.__current = IterationStats(threshold)
+        self.__current_start = (self.expanded, self.generated, self.heuristic_time, time.perf_counter())
+
+    def finish_iteration(self):
+        iteration = self.__current
+        expanded, generated, heuristic_time, start = self.__current_start
+        iteration.expanded = self.expanded - expanded
+        iteration.generated = self.generated - generated
+        iteration.heuristic_time = self.heuristic_time - heuristic_time
+        iteration.time = time.perf_counter() - start
+
+        self.iterations.append(iteration)
+        self.__current = None
+
+        if self.observer is not None:
+            self.observer(iteration)
+
+    @property
+    def thresholds(self) -> list:
+        return [iteration.threshold for iteration in self.iterations]
+
+    @property
+    def branching_factor(self) -> float:
+        return self.generated / self.expanded if self.expanded else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "expanded": self.expanded,
+            "generated": self.generated,
+            "branching_factor": self.branching_factor,
+            "max_depth": self.max_depth,
+            "heuristic_time": self.heuristic_time,
+            "iterations": [iteration.to_dict() for iteration in self.iterations],
+        }
+
+
+def get_bits_per_number(length: int) -> int:
+    """
+    Returns how many bits are needed to store a single number of a board with `length` cells (4 for the 8 and 15 puzzles)
+    """
+    return max(1, (length - 1).bit_length())
+
+
+def pack_numbers(numbers: list) -> int:
+    """
+    Packs the board into a single integer where the number on position `i` takes the bits `[i * bits, (i + 1) * bits)`
+    """
+    bits = get_bits_per_number(len(numbers))
+    state = 0
+    for position, number in enumerate(numbers):
+        state |= number << (position * bits)
+
+    return state
+
+
+def unpack_state(state: int, length: int) -> list:
+    """
+    Reverses `pack_numbers`
+    """
+    bits = get_bits_per_number(length)
+    mask = (1 << bits) - 1
+
+    return [(state >> (position * bits)) & mask for position in range(length)]
+
+
 class MatrixHelper:
     expected_zero_position = -1
 
-    def __init__(self, numbers: list):
-        self.__side_length = int(len(numbers) ** 0.5)
-        self.__numbers = numbers
+    def __init__(self, numbers: list, manhattan_score: int = None):
+        self.__length = len(numbers)
+        self.__side_length = int(self.__length ** 0.5)
+        self.__bits = get_bits_per_number(self.__length)
+        self.__state = pack_numbers(numbers)
+        self.__zero_position = numbers.index(0)
+        # Successors receive their score from the parent (see `__successor_helper`) so it is computed from scratch only for the root
+        self.__manhattan_score = manhattan_score
+
+    @classmethod
+    def from_state(cls, state: int, length: int, zero_position: int, manhattan_score: int = None):
+        """
+        Creates a matrix directly from a packed state, skipping the conversion from a list
+        """
+        matrix = cls.__new__(cls)
+        matrix.__length = length
+        matrix.__side_length = int(length ** 0.5)
+        matrix.__bits = get_bits_per_number(length)
+        matrix.__state = state
+        matrix.__zero_position = zero_position
+        matrix.__manhattan_score = manhattan_score
+
+        return matrix
 
     def __get_expected_position_for_number(self, number) -> int:
         if number == 0:
@@ -58,46 +261,84 @@ class MatrixHelper:
         x, y = coords
         return x * self.__side_length + y
 
-    def __get_manhattan_score_by_position(self, current_position: int) -> int:
-        expected_position = self.__get_expected_position_for_number(self.__numbers[current_position])
+    def __get_number_at(self, position: int) -> int:
+        return (self.__state >> (position * self.__bits)) & ((1 << self.__bits) - 1)
+
+    def __get_manhattan_score_for_number(self, number: int, current_position: int) -> int:
+        expected_position = self.__get_expected_position_for_number(number)
 
         current_x, current_y = self.__position_to_coords(current_position)
         expected_x, expected_y = self.__position_to_coords(expected_position)
 
         return abs(current_x - expected_x) + abs(current_y - expected_y)
 
-    @cached_property
-    def __current_zero_position(self) -> int:
-        return self.__numbers.index(0)
+    @property
+    def numbers(self) -> list:
+        return unpack_state(self.__state, self.__length)
 
-    @cached_property
-    def identifier(self) -> str:
-        return "".join([str(number) for number in self.__numbers])
+    @property
+    def identifier(self) -> int:
+        return self.__state
 
-    @cached_property
+    @property
     def manhattan_score(self) -> int:
-        return sum([self.__get_manhattan_score_by_position(position) for position in range(len(self.__numbers))])
+        if self.__manhattan_score is None:
+            self.__manhattan_score = sum([
+                self.__get_manhattan_score_for_number(self.__get_number_at(position), position) for position in range(self.__length)
+            ])
+
+        return self.__manhattan_score
 
     def is_ordered(self) -> bool:
         return self.manhattan_score == 0
 
     def __successor_helper(self, moved_zero_position):
-        order = self.__numbers.copy()
-        return swap(order, self.__current_zero_position, moved_zero_position)
+        # The zero takes no bits in the packed state, so moving it is the same as moving the other number into its cell
+        moved_number = self.__get_number_at(moved_zero_position)
+        state = (
+            self.__state
+            - (moved_number << (moved_zero_position * self.__bits))
+            + (moved_number << (self.__zero_position * self.__bits))
+        )
+
+        # A single move only swaps the zero with one tile, so the successor score is ours +/- 1 for each of the two
+        manhattan_score = (
+            self.manhattan_score
+            - self.__get_manhattan_score_for_number(moved_number, moved_zero_position)
+            + self.__get_manhattan_score_for_number(moved_number, self.__zero_position)
+            - self.__get_manhattan_score_for_number(0, self.__zero_position)
+            + self.__get_manhattan_score_for_number(0, moved_zero_position)
+        )
 
-    def validate_board(self):
-        number_of_inversions = get_number_of_inversions_without_zero(self.__numbers)
+        return MatrixHelper.from_state(state, self.__length, moved_zero_position, manhattan_score)
+
+    def validate_board(self, expected_zero_position: int = None):
+        """
+        Raises `InvalidBoardError` when the goal (with the zero on `expected_zero_position`, the class attribute by default) can
+        not be reached. The numbers of the goal are in order, so it has no inversions. A move of the zero along a row keeps the
+        inversions and a move along a column changes them by a number with the parity of the width - 1, so on an even width the
+        parity of the inversions + the row of the zero never changes and has to be the one of the goal.
+        """
+        if expected_zero_position is None:
+            expected_zero_position = self.expected_zero_position
+        if expected_zero_position == -1:
+            expected_zero_position = self.__length - 1
+
+        number_of_inversions = get_number_of_inversions_without_zero(self.numbers)
         if self.__side_length % 2 == 1 and number_of_inversions % 2 == 1:
             raise InvalidBoardError("The board cannot have odd number of inversions when the size is odd")
 
         if self.__side_length % 2 == 0:
-            zero_row, _ = self.__position_to_coords(self.__current_zero_position)
+            zero_row, _ = self.__position_to_coords(self.__zero_position)
+            expected_zero_row, _ = self.__position_to_coords(expected_zero_position)
 
-            if (zero_row + number_of_inversions) % 2 == 0:
-                raise InvalidBoardError("The board cannot even number of inversions + row with zero if the size is even")
+            if (zero_row + number_of_inversions) % 2 != expected_zero_row % 2:
+                raise InvalidBoardError(
+                    "The board must have the parity of the number of inversions + row with zero of the goal if the size is even"
+                )
 
     def iter_successor(self):
-        zero_x, zero_y = self.__position_to_coords(self.__current_zero_position)
+        zero_x, zero_y = self.__position_to_coords(self.__zero_position)
 
         if zero_x > 0:
             yield Turn.down, self.__successor_helper(self.__coords_to_position((zero_x - 1, zero_y)))
@@ -109,6 +350,558 @@ class MatrixHelper:
             yield Turn.up, self.__successor_helper(self.__coords_to_position((zero_x + 1, zero_y)))
 
 
+class Puzzle:
+    """
+    Geometry of a board shared by every state of a single search - the expected positions of the numbers and the moves of the zero
+    """
+
+    def __init__(self, length: int, expected_zero_position: int):
+        self.length = length
+        self.side_length = int(length ** 0.5)
+        self.expected_zero_position = expected_zero_position
+
+        self.expected_positions = [expected_zero_position] + [
+            number - 1 if number - 1 < expected_zero_position else number for number in range(1, length)
+        ]
+        # distances[number][position] is the manhattan distance of `number` when it stands on `position`. The zero is not counted
+        # because its distance is not admissible (a single move would be scored as 2)
+        self.distances = [[0] * length] + [
+            [self.__distance(position, self.expected_positions[number]) for position in range(length)] for number in range(1, length)
+        ]
+        # moves[zero_position] is a list of (direction, new_zero_position) in the same order as `MatrixHelper.iter_successor`
+        self.moves = [self.__moves(position) for position in range(length)]
+
+        self.goal = [0] * length
+        for number in range(1, length):
+            self.goal[self.expected_positions[number]] = number
+
+    def __distance(self, source: int, destination: int) -> int:
+        return (
+            abs(source // self.side_length - destination // self.side_length)
+            + abs(source % self.side_length - destination % self.side_length)
+        )
+
+    def __moves(self, zero_position: int) -> list:
+        zero_x, zero_y = zero_position // self.side_length, zero_position % self.side_length
+        moves = []
+
+        if zero_x > 0:
+            moves.append((Turn.down, zero_position - self.side_length))
+        if zero_y > 0:
+            moves.append((Turn.right, zero_position - 1))
+        if zero_y < self.side_length - 1:
+            moves.append((Turn.left, zero_position + 1))
+        if zero_x < self.side_length - 1:
+            moves.append((Turn.up, zero_position + self.side_length))
+
+        return moves
+
+    def manhattan_score(self, numbers: list) -> int:
+        return sum([self.distances[number][position] for position, number in enumerate(numbers)])
+
+
+class PatternDatabase:
+    """
+    Additive pattern database - for every group of numbers it stores the minimal count of moves of those numbers needed to put
+    them on their expected positions, no matter where the other numbers are. Groups are disjoint, so the sum over them is admissible.
+
+    The table of a group is indexed by `sum(position_of(number_i) * length ** i)`, so moving a single number changes the index
+    with one addition. Tables are stored in a single binary file (see `save`) and memory mapped when loaded, so several
+    processes solving boards with the same geometry share one copy of the tables.
+    """
+    MAGIC = b"PDB1"
+    UNKNOWN = 255
+
+    # Default disjoint partitions (5-5-5 for the 15 puzzle) for the sizes where building the tables takes seconds, not hours
+    DEFAULT_GROUPS = {
+        9: ((1, 2, 3, 4), (5, 6, 7, 8)),
+        16: ((1, 2, 3, 5, 6), (4, 7, 8, 11, 12), (9, 10, 13, 14, 15)),
+    }
+
+    def __init__(self, length: int, expected_zero_position: int, groups: tuple, buffer):
+        self.length = length
+        self.expected_zero_position = expected_zero_position
+        self.groups = groups
+        self.__buffer = buffer
+
+        # Every number knows its group (-1 when not in any group) and its weight inside the group index
+        self.group_of = [-1] * length
+        self.weights = [0] * length
+        self.offsets = []
+        offset = self.__header_size(groups)
+        for group_index, group in enumerate(groups):
+            for slot, number in enumerate(group):
+                self.group_of[number] = group_index
+                self.weights[number] = length ** slot
+
+            self.offsets.append(offset)
+            offset += length ** len(group)
+
+    @staticmethod
+    def __header_size(groups: tuple) -> int:
+        return len(PatternDatabase.MAGIC) + 3 + sum([1 + len(group) for group in groups])
+
+    @classmethod
+    def default_groups(cls, length: int) -> tuple:
+        if length in cls.DEFAULT_GROUPS:
+            return cls.DEFAULT_GROUPS[length]
+
+        # Fall back to groups of 4 consecutive numbers
+        numbers = list(range(1, length))
+        return tuple([tuple(numbers[start:start + 4]) for start in range(0, len(numbers), 4)])
+
+    @staticmethod
+    def build_group(puzzle: Puzzle, group: tuple) -> bytearray:
+        """
+        Builds the table of a single group with 0-1 BFS from the ordered board. Only the numbers from the group are distinguished,
+        so moving the zero over any other number is free and moving it over a number from the group costs one move.
+        """
+        length = puzzle.length
+        weights = [length ** slot for slot in range(len(group))]
+        table = bytearray([PatternDatabase.UNKNOWN]) * (length ** len(group))
+        # The search state also holds the zero position - `index * length + zero_position`
+        costs = bytearray([PatternDatabase.UNKNOWN]) * (length ** (len(group) + 1))
+
+        start_index = sum([puzzle.expected_positions[number] * weight for number, weight in zip(group, weights)])
+        start = start_index * length + puzzle.expected_zero_position
+        costs[start] = 0
+        queue = deque([start])
+
+        while queue:
+            state = queue.popleft()
+            cost = costs[state]
+            index, zero_position = divmod(state, length)
+
+            if cost < table[index]:
+                table[index] = cost
+
+            slots = {}
+            rest = index
+            for slot in range(len(group)):
+                rest, position = divmod(rest, length)
+                slots[position] = slot
+
+            for _, moved_zero_position in puzzle.moves[zero_position]:
+                slot = slots.get(moved_zero_position)
+                if slot is None:
+                    next_state = index * length + moved_zero_position
+                    next_cost = cost
+                else:
+                    next_state = (index + (zero_position - moved_zero_position) * weights[slot]) * length + moved_zero_position
+                    next_cost = cost + 1
+
+                if next_cost < costs[next_state]:
+                    costs[next_state] = next_cost
+                    if slot is None:
+                        queue.appendleft(next_state)
+                    else:
+                        queue.append(next_state)
+
+        return table
+
+    @classmethod
+    def build(cls, puzzle: Puzzle, groups: tuple = None):
+        groups = tuple([tuple(group) for group in (groups or cls.default_groups(puzzle.length))])
+
+        numbers = [number for group in groups for number in group]
+        if len(numbers) != len(set(numbers)) or not set(numbers) <= set(range(1, puzzle.length)):
+            raise ValueError("The groups of a pattern database must be disjoint and contain only numbers from the board")
+
+        buffer = bytearray(cls.__header_bytes(puzzle.length, puzzle.expected_zero_position, groups))
+        for group in groups:
+            buffer += cls.build_group(puzzle, group)
+
+        return cls(puzzle.length, puzzle.expected_zero_position, groups, buffer)
+
+    @classmethod
+    def __header_bytes(cls, length: int, expected_zero_position: int, groups: tuple) -> bytes:
+        header = cls.MAGIC + struct.pack("<BBB", length, expected_zero_position, len(groups))
+        for group in groups:
+            header += struct.pack("<B", len(group)) + bytes(group)
+
+        return header
+
+    def save(self, path: str):
+        """
+        File layout: magic, length, expected zero position, groups count, then for every group its size and numbers
+        (one byte each), followed by the tables of the groups one after another (one byte per entry)
+        """
+        # Write to a temporary file first so that concurrent readers never see a partially written database
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as fd:
+            fd.write(self.__buffer)
+
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def load(cls, path: str):
+        with open(path, "rb") as fd:
+            buffer = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if buffer[:len(cls.MAGIC)] != cls.MAGIC:
+            raise ValueError(f"{path} is not a pattern database")
+
+        length, expected_zero_position, groups_count = struct.unpack_from("<BBB", buffer, len(cls.MAGIC))
+        groups = []
+        offset = len(cls.MAGIC) + 3
+        for _ in range(groups_count):
+            size = buffer[offset]
+            groups.append(tuple(buffer[offset + 1:offset + 1 + size]))
+            offset += 1 + size
+
+        return cls(length, expected_zero_position, tuple(groups), buffer)
+
+    @classmethod
+    def for_puzzle(cls, puzzle: Puzzle, groups: tuple = None, directory: str = DATA_PATH):
+        """
+        Loads the database for the given geometry from `directory` and builds (and saves) it first if it does not exist yet
+        """
+        groups = groups or cls.default_groups(puzzle.length)
+        name = "_".join([".".join([str(number) for number in group]) for group in groups])
+        path = os.path.join(directory, f"{puzzle.side_length}x{puzzle.side_length}-{puzzle.expected_zero_position}-{name}.pdb")
+
+        if not os.path.exists(path):
+            os.makedirs(directory, exist_ok=True)
+            cls.build(puzzle, groups).save(path)
+
+        return cls.load(path)
+
+    def indices(self, board: list) -> list:
+        indices = [0] * len(self.groups)
+        for position, number in enumerate(board):
+            if self.group_of[number] >= 0:
+                indices[self.group_of[number]] += position * self.weights[number]
+
+        return indices
+
+    def score_indices(self, indices: list) -> int:
+        return sum([self.__buffer[offset + index] for offset, index in zip(self.offsets, indices)])
+
+    def score(self, board: list) -> int:
+        return self.score_indices(self.indices(board))
+
+    def move(self, indices: list, number: int, source: int, destination: int, score: int) -> int:
+        """
+        Updates `indices` in place after `number` moved from `source` to `destination` and returns the new score
+        """
+        group = self.group_of[number]
+        if group < 0:
+            return score
+
+        offset = self.offsets[group]
+        index = indices[group]
+        new_index = index + (destination - source) * self.weights[number]
+        indices[group] = new_index
+
+        return score - self.__buffer[offset + index] + self.__buffer[offset + new_index]
+
+
+class Heuristics:
+    manhattan = 'manhattan'
+    linear_conflict = 'linear-conflict'
+    walking_distance = 'walking-distance'
+    pattern_database = 'pattern-database'
+
+
+class Heuristic:
+    """
+    Base class of the heuristics used by the path search.
+
+    A heuristic describes every board with a state (an int or a tuple) which is created once for the start board with `initial`
+    and then derived from the state of the parent with `move`. States are never modified in place, so the search does not have to
+    undo anything when it backtracks.
+    """
+    name = None
+
+    def __init__(self, puzzle: Puzzle):
+        self.puzzle = puzzle
+
+    def initial(self, board: list):
+        raise NotImplementedError()
+
+    def move(self, state, board: list, number: int, source: int, destination: int):
+        """
+        Returns the state after `number` moved from `source` to `destination` (`board` is already updated)
+        """
+        raise NotImplementedError()
+
+    def estimate(self, state) -> int:
+        raise NotImplementedError()
+
+
+class ManhattanHeuristic(Heuristic):
+    """
+    The state is the manhattan score itself
+    """
+    name = Heuristics.manhattan
+
+    def initial(self, board: list) -> int:
+        return self.puzzle.manhattan_score(board)
+
+    def move(self, state: int, board: list, number: int, source: int, destination: int) -> int:
+        distances = self.puzzle.distances[number]
+        return state - distances[source] + distances[destination]
+
+    def estimate(self, state: int) -> int:
+        return state
+
+
+class LinearConflictHeuristic(Heuristic):
+    """
+    Manhattan score plus 2 moves for every number that has to leave its row (column) so that the numbers which are already in
+    their expected row (column) can pass each other. The numbers that can stay are the longest increasing subsequence of their
+    expected columns (rows).
+
+    The state is `(manhattan score, conflicts per row, conflicts per column)`. Moving a number sideways keeps the order in its
+    row, so only the conflicts of the two columns change (and the two rows for a vertical move).
+    """
+    name = Heuristics.linear_conflict
+
+    def __init__(self, puzzle: Puzzle):
+        super().__init__(puzzle)
+        self.__lines_cache = {}
+
+    def __line_conflicts(self, board: list, line: int, is_row: bool) -> int:
+        side_length = self.puzzle.side_length
+        expected_offsets = []
+        for offset in range(side_length):
+            position = line * side_length + offset if is_row else offset * side_length + line
+            number = board[position]
+            if number == 0:
+                continue
+
+            expected_position = self.puzzle.expected_positions[number]
+            if is_row and expected_position // side_length == line:
+                expected_offsets.append(expected_position % side_length)
+            elif not is_row and expected_position % side_length == line:
+                expected_offsets.append(expected_position // side_length)
+
+        key = tuple(expected_offsets)
+        if key not in self.__lines_cache:
+            # Longest increasing subsequence - the lines have at most a few numbers, so the quadratic version is enough
+            longest = [1] * len(key)
+            for i in range(len(key)):
+                for j in range(i):
+                    if key[j] < key[i] and longest[j] + 1 > longest[i]:
+                        longest[i] = longest[j] + 1
+
+            self.__lines_cache[key] = len(key) - max(longest, default=0)
+
+        return self.__lines_cache[key]
+
+    def initial(self, board: list) -> tuple:
+        side_length = self.puzzle.side_length
+        rows = tuple([self.__line_conflicts(board, row, True) for row in range(side_length)])
+        columns = tuple([self.__line_conflicts(board, column, False) for column in range(side_length)])
+
+        return self.puzzle.manhattan_score(board), rows, columns
+
+    def move(self, state: tuple, board: list, number: int, source: int, destination: int) -> tuple:
+        manhattan_score, rows, columns = state
+        distances = self.puzzle.distances[number]
+        manhattan_score = manhattan_score - distances[source] + distances[destination]
+
+        side_length = self.puzzle.side_length
+        source_row, source_column = divmod(source, side_length)
+        destination_row, destination_column = divmod(destination, side_length)
+
+        if source_row == destination_row:
+            columns = list(columns)
+            columns[source_column] = self.__line_conflicts(board, source_column, False)
+            columns[destination_column] = self.__line_conflicts(board, destination_column, False)
+            columns = tuple(columns)
+        else:
+            rows = list(rows)
+            rows[source_row] = self.__line_conflicts(board, source_row, True)
+            rows[destination_row] = self.__line_conflicts(board, destination_row, True)
+            rows = tuple(rows)
+
+        return manhattan_score, rows, columns
+
+    def estimate(self, state: tuple) -> int:
+        manhattan_score, rows, columns = state
+        return manhattan_score + 2 * (sum(rows) + sum(columns))
+
+
+class WalkingDistanceHeuristic(Heuristic):
+    """
+    Walking distance - the board is reduced to a matrix where `counts[row][expected_row]` is the count of numbers on `row` which
+    belong to `expected_row`. The distance of that matrix to the ordered one (moving the zero only between rows) is found once
+    with BFS for all matrices. The same is done for the columns and the estimate is the sum of both.
+
+    The state is `(rows key, columns key)` - the matrices packed into ints, so a move changes a key with one addition.
+    Only boards up to 4x4 are supported, for bigger ones the tables become too large.
+    """
+    name = Heuristics.walking_distance
+    BITS = 3
+    MAX_LENGTH = 16
+
+    def __init__(self, puzzle: Puzzle):
+        super().__init__(puzzle)
+
+        if puzzle.length > self.MAX_LENGTH:
+            raise ValueError(f"The walking distance supports boards with at most {self.MAX_LENGTH} cells")
+
+        side_length = puzzle.side_length
+        self.__rows_table = self.__build_table(puzzle.expected_zero_position // side_length)
+        self.__columns_table = self.__build_table(puzzle.expected_zero_position % side_length)
+
+    def __shift(self, line: int, expected_line: int) -> int:
+        return self.BITS * (line * self.puzzle.side_length + expected_line)
+
+    def __build_table(self, expected_zero_line: int) -> dict:
+        side_length = self.puzzle.side_length
+        start = 0
+        for line in range(side_length):
+            start += (side_length - (line == expected_zero_line)) << self.__shift(line, line)
+
+        mask = (1 << self.BITS) - 1
+        table = {start: 0}
+        queue = deque([(start, expected_zero_line)])
+        while queue:
+            key, zero_line = queue.popleft()
+            for line in (zero_line - 1, zero_line + 1):
+                if not 0 <= line < side_length:
+                    continue
+
+                # Any number from the neighbour line can move into the line with the zero
+                for expected_line in range(side_length):
+                    if (key >> self.__shift(line, expected_line)) & mask == 0:
+                        continue
+
+                    next_key = key - (1 << self.__shift(line, expected_line)) + (1 << self.__shift(zero_line, expected_line))
+                    if next_key not in table:
+                        table[next_key] = table[key] + 1
+                        queue.append((next_key, line))
+
+        return table
+
+    def initial(self, board: list) -> tuple:
+        side_length = self.puzzle.side_length
+        rows_key = columns_key = 0
+        for position, number in enumerate(board):
+            if number == 0:
+                continue
+
+            row, column = divmod(position, side_length)
+            expected_row, expected_column = divmod(self.puzzle.expected_positions[number], side_length)
+            rows_key += 1 << self.__shift(row, expected_row)
+            columns_key += 1 << self.__shift(column, expected_column)
+
+        return rows_key, columns_key
+
+    def move(self, state: tuple, board: list, number: int, source: int, destination: int) -> tuple:
+        rows_key, columns_key = state
+        side_length = self.puzzle.side_length
+        source_row, source_column = divmod(source, side_length)
+        destination_row, destination_column = divmod(destination, side_length)
+        expected_row, expected_column = divmod(self.puzzle.expected_positions[number], side_length)
+
+        if source_row == destination_row:
+            columns_key += (1 << self.__shift(destination_column, expected_column)) - (1 << self.__shift(source_column, expected_column))
+        else:
+            rows_key += (1 << self.__shift(destination_row, expected_row)) - (1 << self.__shift(source_row, expected_row))
+
+        return rows_key, columns_key
+
+    def estimate(self, state: tuple) -> int:
+        rows_key, columns_key = state
+        return self.__rows_table[rows_key] + self.__columns_table[columns_key]
+
+
+class PatternDatabaseHeuristic(Heuristic):
+    """
+    Additive pattern database lookup, the state is `(score, index per group)`
+    """
+    name = Heuristics.pattern_database
+
+    def __init__(self, puzzle: Puzzle, pattern_database: PatternDatabase = None):
+        super().__init__(puzzle)
+
+        if pattern_database is None:
+            pattern_database = PatternDatabase.for_puzzle(puzzle)
+        elif (pattern_database.length, pattern_database.expected_zero_position) != (puzzle.length, puzzle.expected_zero_position):
+            raise ValueError("The pattern database is built for a different board")
+
+        self.pattern_database = pattern_database
+
+    def initial(self, board: list) -> tuple:
+        indices = self.pattern_database.indices(board)
+        return self.pattern_database.score_indices(indices), tuple(indices)
+
+    def move(self, state: tuple, board: list, number: int, source: int, destination: int) -> tuple:
+        score, indices = state
+        indices = list(indices)
+        score = self.pattern_database.move(indices, number, source, destination, score)
+
+        return score, tuple(indices)
+
+    def estimate(self, state: tuple) -> int:
+        return state[0]
+
+
+class TimedHeuristic(Heuristic):
+    """
+    Wraps another heuristic and adds the time spent in it to `stats.heuristic_time`
+    """
+
+    def __init__(self, heuristic: Heuristic, stats):
+        super().__init__(heuristic.puzzle)
+        self.heuristic = heuristic
+        self.name = heuristic.name
+        self.stats = stats
+
+    def initial(self, board: list):
+        start = time.perf_counter()
+        state = self.heuristic.initial(board)
+        self.stats.heuristic_time += time.perf_counter() - start
+
+        return state
+
+    def move(self, state, board: list, number: int, source: int, destination: int):
+        start = time.perf_counter()
+        state = self.heuristic.move(state, board, number, source, destination)
+        self.stats.heuristic_time += time.perf_counter() - start
+
+        return state
+
+    def estimate(self, state) -> int:
+        start = time.perf_counter()
+        estimate = self.heuristic.estimate(state)
+        self.stats.heuristic_time += time.perf_counter() - start
+
+        return estimate
+
+
+HEURISTICS = {
+    heuristic.name: heuristic
+    for heuristic in [ManhattanHeuristic, LinearConflictHeuristic, WalkingDistanceHeuristic, PatternDatabaseHeuristic]
+}
+
+
+def create_heuristic(name: str, puzzle: Puzzle, pattern_database: PatternDatabase = None) -> Heuristic:
+    if name not in HEURISTICS:
+        raise ValueError(f"Unknown heuristic {name}")
+
+    if name == Heuristics.pattern_database:
+        return PatternDatabaseHeuristic(puzzle, pattern_database)
+
+    return HEURISTICS[name](puzzle)
+
+
+@lru_cache(maxsize=None)
+def get_puzzle(length: int, expected_zero_position: int) -> Puzzle:
+    return Puzzle(length, expected_zero_position)
+
+
+@lru_cache(maxsize=None)
+def get_heuristic(name: str, length: int, expected_zero_position: int) -> Heuristic:
+    """
+    Same as `create_heuristic` but the heuristic (and its tables) is created only once per process for every board geometry
+    """
+    return create_heuristic(name, get_puzzle(length, expected_zero_position))
+
+
 class Node:
     def __init__(self, matrix: MatrixHelper, parent_heuristic: int = 0):
         self.matrix = matrix
@@ -143,7 +936,7 @@ class Tree:
         return f"Nodes: {', '.join([str(node) for key, node in self.nodes.items()])}\nEdges: {json.dumps(self.edges, indent=2)}"
 
 
-def iterative_deepening_a_star_rec(tree, node: Node, visited: set, directions: list, distance, threshold):
+def iterative_deepening_a_star_rec(tree, node: Node, visited: set, directions: list, distance, threshold, stats: SearchStats = None):
     if node.id in visited:
         return math.inf, directions
 
@@ -157,8 +950,11 @@ def iterative_deepening_a_star_rec(tree, node: Node, visited: set, directions: l
     visited.add(node.id)
 
     # If not then we discover the next variations of the board and update the tree with them
-    for direction, order in node.matrix.iter_successor():
-        tree.add_child(parent_id=node.id, direction=direction, child=Node(MatrixHelper(order), parent_heuristic=node.heuristic))
+    for direction, matrix in node.matrix.iter_successor():
+        tree.add_child(parent_id=node.id, direction=direction, child=Node(matrix, parent_heuristic=node.heuristic))
+
+    if stats is not None:
+        stats.count(1, len(tree.edges[node.id]), distance)
 
     if not tree.edges[node.id]:
         return math.inf, directions
@@ -176,6 +972,7 @@ def iterative_deepening_a_star_rec(tree, node: Node, visited: set, directions: l
             directions=[*directions, direction],
             distance=distance + 1,
             threshold=threshold,
+            stats=stats,
         )
 
         if new_distance < min_distance:
@@ -185,19 +982,26 @@ def iterative_deepening_a_star_rec(tree, node: Node, visited: set, directions: l
     return min_distance, min_directions
 
 
-def iterative_deepening_a_star(tree: Tree, start: Node):
+def iterative_deepening_a_star(tree: Tree, start: Node, stats: SearchStats = None):
     threshold = start.heuristic
 
     while True:
+        if stats is not None:
+            stats.start_iteration(threshold)
+
         distance, directions = iterative_deepening_a_star_rec(
             tree,
             start,
             visited=set(),
             directions=[],
             distance=0,
-            threshold=threshold
+            threshold=threshold,
+            stats=stats,
         )
 
+        if stats is not None:
+            stats.finish_iteration()
+
         if distance == math.inf:
             return -1, []
         elif distance <= 0:
@@ -206,27 +1010,669 @@ def iterative_deepening_a_star(tree: Tree, start: Node):
             threshold = distance
 
 
-def solution(n: int, expected_zero_index: int, numbers: list) -> tuple:
+class ReplacementPolicy:
+    # A new board always takes the slot
+    always = 'always'
+    # A new board takes the slot only from a board with at least as many moves or from an earlier pass, so the boards close to the
+    # start (the ones with the biggest subtrees) stay in the table
+    shallower = 'shallower'
+
+
+class TranspositionTable:
+    """
+    Fixed size table of boards (packed with `pack_numbers`) seen by the path search. For every board it keeps the number of
+    moves it was reached with, the pass (threshold iteration) it was reached in and a lower bound of the moves left to the
+    ordered board, which starts as the heuristic estimate and is raised with the estimates backed up from below the board.
+
+    The slots live in preallocated arrays, so the memory does not grow with the search. A board that maps to a taken slot
+    either replaces the old one or is dropped, depending on `policy`. The bounds hold only for the ordered board they were found
+    for, so the table is cleared when it is used for a different expected zero position (see `prepare`).
+    """
+    # Approximate bytes per slot - the packed board in a list (a pointer and an int object) and the three arrays
+    SLOT_SIZE = 56
+    MAX_BOUND = 65535
+
+    def __init__(self, memory_limit: int = 64 * 1024 * 1024, policy: str = ReplacementPolicy.shallower):
+        if policy not in (ReplacementPolicy.always, ReplacementPolicy.shallower):
+            raise ValueError(f"Unknown replacement policy {policy}")
+
+        self.capacity = max(1, memory_limit // self.SLOT_SIZE)
+        self.policy = policy
+        self.keys = [None] * self.capacity
+        self.distances = array('H', [0]) * self.capacity
+        self.bounds = array('H', [0]) * self.capacity
+        self.iterations = array('I', [0]) * self.capacity
+        # Never reset, so the slots stored by an earlier search are never mistaken for the current pass
+        self.iteration = 0
+        self.goal = None
+
+        self.hits = 0
+        self.stores = 0
+        self.replacements = 0
+
+    def prepare(self, goal: int):
+        if goal != self.goal:
+            self.keys = [None] * self.capacity
+            self.goal = goal
+
+    def next_iteration(self):
+        self.iteration += 1
+
+    def __slot(self, key: int) -> int:
+        # Spread the hash with a multiplicative hash, the low bits of a packed board only describe its first cells
+        return ((hash(key) * 0x9E3779B97F4A7C15) >> 32) % self.capacity
+
+    def lookup(self, key: int) -> int:
+        """
+        Returns the slot of the board or -1 when it is not in the table
+        """
+        slot = self.__slot(key)
+        return slot if self.keys[slot] == key else -1
+
+    def bound(self, key: int) -> int:
+        slot = self.lookup(key)
+        return self.bounds[slot] if slot >= 0 else 0
+
+    def store(self, key: int, distance: int, bound: int):
+        slot = self.__slot(key)
+        bound = min(bound, self.MAX_BOUND)
+
+        if self.keys[slot] == key:
+            if bound < self.bounds[slot]:
+                bound = self.bounds[slot]
+        elif self.keys[slot] is not None:
+            if self.policy == ReplacementPolicy.shallower and self.iterations[slot] == self.iteration and self.distances[slot] < distance:
+                return
+            self.replacements += 1
+
+        self.keys[slot] = key
+        self.distances[slot] = distance
+        self.bounds[slot] = bound
+        self.iterations[slot] = self.iteration
+        self.stores += 1
+
+    def raise_bound(self, key: int, bound: int):
+        slot = self.lookup(key)
+        if slot >= 0 and bound > self.bounds[slot]:
+            self.bounds[slot] = min(bound, self.MAX_BOUND)
+
+
+def iterative_deepening_a_star_path_iteration(
+        puzzle: Puzzle,
+        heuristic: Heuristic,
+        board: list,
+        state,
+        threshold: int,
+        deadline: float = None,
+        transposition_table: TranspositionTable = None,
+        previous_zero_position: int = -1,
+        stop_event=None,
+        stats: SearchStats = None,
+) -> tuple:
+    """
+    A single depth first pass of IDA* bounded by `threshold`. The zero is moved in place on `board` and every move is undone
+    when backtracking, so `board` is unchanged unless a solution is found.
+
+    There is no recursion - the stack holds one frame per ply with the not yet visited children of that ply ordered by their
+    estimate, and the directions of the current path live in a single shared list. A child never moves the zero back to the
+    cell it came from.
+
+    With a `transposition_table` a child is skipped when the same board was already reached in this pass with at most the
+    same number of moves, and the estimates are raised to the bounds backed up from the earlier passes.
+
+    `previous_zero_position` is where the zero was before the start board (its first move is not generated) and `stop_event`
+    is an event which cancels the search with `SearchCancelledError` once it is set. The visited boards are counted in `stats`.
+
+    :return: tuple - the length of the solution and its directions when a solution is found, otherwise the minimal estimate
+    that exceeded the threshold (`math.inf` when there is none) and None
+    """
+    goal = puzzle.goal
+    moves = puzzle.moves
+    move = heuristic.move
+    estimate = heuristic.estimate
+
+    root_estimate = estimate(state)
+    if root_estimate == 0 and board == goal:
+        return 0, []
+    if root_estimate > threshold:
+        return root_estimate, None
+
+    table = transposition_table
+    if table is not None:
+        bits = get_bits_per_number(puzzle.length)
+        board_key = pack_numbers(board)
+        root_estimate = max(root_estimate, table.bound(board_key))
+        if root_estimate > threshold:
+            return root_estimate, None
+        table.store(board_key, 0, root_estimate)
+    else:
+        bits = board_key = None
+
+    directions = []
+    # The zero positions along the current path, the last one is where the zero is now
+    zero_positions = [board.index(0)]
+    # Every frame is [children, index of the next child to visit, min estimate below the node, packed board of the node]
+    stack = []
+    min_exceeded = math.inf
+    # The start board is expanded below without being counted in the loop
+    expanded = 1
+    generated = 0
+    max_depth = 0
+    key = itemgetter(0)
+
+    while True:
+        # Expand the node at the end of the current path, keeping only the children within the threshold
+        zero_position = zero_positions[-1]
+        distance = len(directions) + 1
+        children = []
+        min_bound = math.inf
+        for direction, moved_zero_position in moves[zero_position]:
+            reverse = moved_zero_position == previous_zero_position
+            if reverse and table is None:
+                continue
+
+            # The heuristic expects the board after the move, so the move is applied only while the child state is computed
+            number = board[moved_zero_position]
+            board[zero_position], board[moved_zero_position] = number, 0
+            child_state = move(state, board, number, moved_zero_position, zero_position)
+            board[zero_position], board[moved_zero_position] = 0, number
+
+            child_estimate = distance + estimate(child_state)
+            if reverse:
+                # The reverse move is never searched, but the bound stored for the node has to hold when it is entered
+                # from another parent, so the estimate of going back is part of it
+                if child_estimate < min_bound:
+                    min_bound = child_estimate
+                continue
+
+            generated += 1
+            child_key = None
+            if table is not None:
+                child_key = board_key + (number << (zero_position * bits)) - (number << (moved_zero_position * bits))
+                slot = table.lookup(child_key)
+                if slot >= 0:
+                    child_bound = distance + table.bounds[slot]
+                    if table.iterations[slot] == table.iteration and table.distances[slot] <= distance:
+                        # Already searched (or being searched) in this pass with at least the same budget
+                        table.hits += 1
+                        if child_bound < min_bound:
+                            min_bound = child_bound
+                        continue
+                    if child_bound > child_estimate:
+                        child_estimate = child_bound
+
+            if child_estimate > threshold:
+                if child_estimate < min_exceeded:
+                    min_exceeded = child_estimate
+                if child_estimate < min_bound:
+                    min_bound = child_estimate
+                continue
+
+            children.append((child_estimate, direction, moved_zero_position, child_state, child_key))
+
+        if children:
+            # Most promising children first, the sort is stable so equal estimates keep the order of `Puzzle.moves`
+            if len(children) > 1:
+                children.sort(key=key)
+            stack.append([children, 0, min_bound, board_key])
+        else:
+            if table is not None:
+                table.raise_bound(board_key, min_bound - distance + 1)
+
+            if directions:
+                # A leaf - undo the move that led to it right away instead of going through a frame
+                directions.pop()
+                zero_positions.pop()
+                board[zero_position], board[zero_positions[-1]] = board[zero_positions[-1]], 0
+                if stack and min_bound < stack[-1][2]:
+                    stack[-1][2] = min_bound
+
+        # Find the next child to visit, backtracking over the exhausted frames
+        while stack:
+            frame = stack[-1]
+            children, child_index, min_bound, board_key = frame
+
+            if child_index == len(children):
+                stack.pop()
+                if table is not None:
+                    table.raise_bound(board_key, min_bound - len(directions))
+
+                if stack:
+                    directions.pop()
+                    zero_position = zero_positions.pop()
+                    board[zero_position], board[zero_positions[-1]] = board[zero_positions[-1]], 0
+                    if min_bound < stack[-1][2]:
+                        stack[-1][2] = min_bound
+                continue
+
+            frame[1] = child_index + 1
+            child_estimate, direction, moved_zero_position, state, board_key = children[child_index]
+            break
+        else:
+            if stats is not None:
+                stats.count(expanded, generated, max_depth)
+            return min_exceeded, None
+
+        expanded += 1
+        if expanded % 1024 == 0:
+            if deadline is not None and time.monotonic() > deadline:
+                raise SearchTimeoutError("The search did not finish in time")
+            if stop_event is not None and stop_event.is_set():
+                raise SearchCancelledError("The search was cancelled")
+
+        previous_zero_position = zero_positions[-1]
+        board[previous_zero_position], board[moved_zero_position] = board[moved_zero_position], 0
+        zero_positions.append(moved_zero_position)
+        directions.append(direction)
+        if len(directions) > max_depth:
+            max_depth = len(directions)
+
+        if child_estimate == len(directions) and board == goal:
+            if stats is not None:
+                stats.count(expanded, generated, max_depth)
+            return len(directions), directions.copy()
+
+        if table is not None:
+            table.store(board_key, len(directions), child_estimate - len(directions))
+
+
+def iterative_deepening_a_star_path(
+        puzzle: Puzzle,
+        heuristic: Heuristic,
+        numbers: list,
+        deadline: float = None,
+        transposition_table: TranspositionTable = None,
+        stats: SearchStats = None,
+):
+    board = numbers.copy()
+    state = heuristic.initial(board)
+    threshold = heuristic.estimate(state)
+
+    if transposition_table is not None:
+        transposition_table.prepare(pack_numbers(puzzle.goal))
+
+    while True:
+        if transposition_table is not None:
+            transposition_table.next_iteration()
+        if stats is not None:
+            stats.start_iteration(threshold)
+
+        distance, directions = iterative_deepening_a_star_path_iteration(
+            puzzle,
+            heuristic,
+            board,
+            state,
+            threshold,
+            deadline=deadline,
+            transposition_table=transposition_table,
+            stats=stats,
+        )
+
+        if stats is not None:
+            stats.finish_iteration()
+
+        if directions is not None:
+            return distance, directions
+        elif distance == math.inf:
+            return -1, []
+
+        threshold = distance
+
+
+# Set in the worker processes of `parallel_iterative_deepening_a_star`
+worker_stop_event = None
+
+
+def init_parallel_worker(stop_event):
+    global worker_stop_event
+    worker_stop_event = stop_event
+
+
+def search_subproblem(
+        heuristic: str,
+        expected_zero_position: int,
+        board: list,
+        previous_zero_position: int,
+        threshold: int,
+        deadline: float,
+        time_heuristic: bool = False,
+):
+    """
+    Runs a single pass of the path search below one board of the frontier in a worker process.
+    Returns the result of `iterative_deepening_a_star_path_iteration` extended with the `SearchStats` of the pass or None
+    when it was cancelled.
+    """
+    puzzle = get_puzzle(len(board), expected_zero_position)
+    instance = get_heuristic(heuristic, puzzle.length, expected_zero_position)
+    stats = SearchStats(time_heuristic=time_heuristic)
+    if time_heuristic:
+        instance = TimedHeuristic(instance, stats)
+
+    try:
+        return *iterative_deepening_a_star_path_iteration(
+            puzzle,
+            instance,
+            board,
+            instance.initial(board),
+            threshold,
+            deadline=deadline,
+            previous_zero_position=previous_zero_position,
+            stop_event=worker_stop_event,
+            stats=stats,
+        ), stats
+    except SearchCancelledError:
+        return None
+
+
+def get_frontier(puzzle: Puzzle, numbers: list, frontier_size: int) -> tuple:
+    """
+    Expands the start board breadth first until there are at least `frontier_size` boards on the last level
+
+    :return: tuple - the directions of the solution when one is found while expanding (otherwise None) and the last level as
+    a list of (board, zero position, previous zero position, directions)
+    """
+    goal = puzzle.goal
+    if numbers == goal:
+        return [], []
+
+    level = [(numbers.copy(), numbers.index(0), -1, [])]
+    while len(level) < frontier_size:
+        next_level = []
+        for board, zero_position, previous_zero_position, directions in level:
+            for direction, moved_zero_position in puzzle.moves[zero_position]:
+                if moved_zero_position == previous_zero_position:
+                    continue
+
+                child = board.copy()
+                child[zero_position], child[moved_zero_position] = child[moved_zero_position], 0
+                # Levels are expanded in order, so the first solution is the shortest one
+                if child == goal:
+                    return [*directions, direction], []
+
+                next_level.append((child, moved_zero_position, zero_position, [*directions, direction]))
+
+        level = next_level
+
+    return None, level
+
+
+def parallel_iterative_deepening_a_star(
+        puzzle: Puzzle,
+        heuristic: str,
+        numbers: list,
+        workers: int = None,
+        frontier_size: int = 256,
+        deadline: float = None,
+        stats: SearchStats = None,
+):
+    """
+    IDA* split between `workers` processes. The start board is expanded to a frontier of about `frontier_size` boards and for
+    every threshold each board of the frontier is searched in a worker with the threshold reduced by its distance from the start.
+
+    All boards of a threshold are searched before the next one is tried, so the first solution found is optimal. As soon as
+    it is found the pending boards are cancelled and the running workers are stopped.
+    """
+    directions, frontier = get_frontier(puzzle, numbers, frontier_size)
+    if directions is not None:
+        return len(directions), directions
+
+    instance = get_heuristic(heuristic, puzzle.length, puzzle.expected_zero_position)
+    # The most promising boards are searched first, so a solution (if any) is found early in the pass
+    estimates = []
+    for node in frontier:
+        board, _, _, directions = node
+        estimates.append((len(directions) + instance.estimate(instance.initial(board)), node))
+    frontier = sorted(estimates, key=itemgetter(0))
+    threshold = frontier[0][0]
+
+    stop_event = multiprocessing.Event()
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_parallel_worker, initargs=(stop_event,)) as executor:
+        while True:
+            if stats is not None:
+                stats.start_iteration(threshold)
+
+            futures = {}
+            min_exceeded = math.inf
+            for estimate, (board, zero_position, previous_zero_position, directions) in frontier:
+                # Boards which exceed the threshold on their own are not worth a round trip to a worker
+                if estimate > threshold:
+                    min_exceeded = min(min_exceeded, estimate)
+                    continue
+
+                future = executor.submit(
+                    search_subproblem,
+                    heuristic,
+                    puzzle.expected_zero_position,
+                    board,
+                    previous_zero_position,
+                    threshold - len(directions),
+                    deadline,
+                    stats is not None and stats.time_heuristic,
+                )
+                futures[future] = directions
+
+            for future in as_completed(futures):
+                distance, subproblem_directions, subproblem_stats = future.result()
+                if stats is not None:
+                    # The depths of a worker start at its frontier board
+                    subproblem_stats.max_depth += len(futures[future])
+                    stats.merge(subproblem_stats)
+
+                if subproblem_directions is not None:
+                    stop_event.set()
+                    for other in futures:
+                        other.cancel()
+
+                    if stats is not None:
+                        stats.finish_iteration()
+
+                    directions = futures[future] + subproblem_directions
+                    return len(directions), directions
+
+                min_exceeded = min(min_exceeded, distance + len(futures[future]))
+
+            if stats is not None:
+                stats.finish_iteration()
+
+            if min_exceeded == math.inf:
+                return -1, []
+
+            threshold = min_exceeded
+
+
+def solution(
+        n: int,
+        expected_zero_index: int,
+        numbers: list,
+        mode: str = SearchMode.path,
+        heuristic: str = Heuristics.manhattan,
+        pattern_database: PatternDatabase = None,
+        timeout: float = None,
+        transposition_table: TranspositionTable = None,
+        workers: int = None,
+        stats: SearchStats = None,
+) -> tuple:
     """
     Finds the optimal path in a generated sequence table for `slide puzzle game`
 
+    `heuristic` is one of `Heuristics` and is used in `SearchMode.path` and `SearchMode.parallel`. With
+    `Heuristics.pattern_database` the tables are taken from `pattern_database` when given, otherwise they are loaded (or built)
+    with `PatternDatabase.for_puzzle`.
+    Heuristic tables are kept for the lifetime of the process, so solving many boards of the same size builds them once.
+    When `timeout` (in seconds) is given and the path search takes longer `SearchTimeoutError` is raised.
+    `transposition_table` is optional and used only in `SearchMode.path`, it can be reused between calls.
+    `SearchMode.parallel` runs the path search in `workers` processes (all CPUs by default) with the default heuristic tables.
+    When `stats` is given the search counts its work in it (per threshold iteration as well, see `SearchStats`).
+
     :return: tuple - the first member of the tuple is number of turns for the optimal
     path. The second member is list of the the turns needed to perform the optimal path.
     """
     # Set the expected zero position as class attribute of MatrixHelper
     MatrixHelper.expected_zero_position = len(numbers) - 1 if expected_zero_index == -1 else expected_zero_index
 
-    # init tree
+    # Boards which can not reach the goal are rejected here, the path searches would never stop on them
+    validate_numbers(numbers, MatrixHelper.expected_zero_position)
     matrix = MatrixHelper(numbers)
     matrix.validate_board()
 
+    if mode == SearchMode.path:
+        puzzle = get_puzzle(len(numbers), MatrixHelper.expected_zero_position)
+        if pattern_database is None:
+            heuristic = get_heuristic(heuristic, puzzle.length, puzzle.expected_zero_position)
+        else:
+            heuristic = create_heuristic(heuristic, puzzle, pattern_database)
+
+        if stats is not None and stats.time_heuristic:
+            heuristic = TimedHeuristic(heuristic, stats)
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        return iterative_deepening_a_star_path(
+            puzzle,
+            heuristic,
+            numbers,
+            deadline=deadline,
+            transposition_table=transposition_table,
+            stats=stats,
+        )
+    elif mode == SearchMode.parallel:
+        if pattern_database is not None or transposition_table is not None:
+            raise ValueError("The parallel search supports neither custom pattern databases nor transposition tables")
+
+        puzzle = get_puzzle(len(numbers), MatrixHelper.expected_zero_position)
+        if heuristic == Heuristics.pattern_database:
+            # Build the tables once here instead of in every worker
+            PatternDatabase.for_puzzle(puzzle)
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        return parallel_iterative_deepening_a_star(puzzle, heuristic, numbers, workers=workers, deadline=deadline, stats=stats)
+    elif mode != SearchMode.tree:
+        raise ValueError(f"Unknown search mode {mode}")
+
+    # init tree
     start = Node(matrix)
     tree = Tree(start)
 
-    return iterative_deepening_a_star(tree, start)
+    return iterative_deepening_a_star(tree, start, stats=stats)
+
+
+def solve_one(index: int, numbers: list, expected_zero_index: int, heuristic: str, timeout: float) -> dict:
+    """
+    Solves a single board of `solve_many` and describes the outcome as a dictionary which can be dumped as JSON
+    """
+    result = {"index": index, "board": numbers}
+    start = time.time()
+
+    try:
+        distance, directions = solution(len(numbers) - 1, expected_zero_index, numbers, heuristic=heuristic, timeout=timeout)
+        result.update(distance=distance, directions=directions)
+    except SearchTimeoutError:
+        result.update(error="timeout")
+    except (InvalidBoardError, ValueError) as error:
+        result.update(error=str(error))
+
+    result.update(time=time.time() - start)
+    return result
+
+
+def get_batch_result(future, index: int, numbers: list) -> dict:
+    """
+    :return: the result of a finished `solve_one` future, or an error record when the worker failed unexpectedly
+    """
+    try:
+        return future.result()
+    except Exception as error:
+        return {"index": index, "board": numbers, "error": f"{type(error).__name__}: {error}"}
+
+
+def solve_many(
+        boards,
+        expected_zero_index: int = -1,
+        heuristic: str = Heuristics.manhattan,
+        workers: int = None,
+        timeout: float = None,
+        max_pending: int = None,
+):
+    """
+    Solves every board from the `boards` iterable in a pool of `workers` processes and yields the results of `solve_one`
+    in the order in which they finish (`index` is the position of the board in `boards`). A board that could not be read
+    (an `InvalidBoardError` instead of the numbers, see `read_boards`) is yielded right away as an error record.
+
+    The boards are read only while fewer than `max_pending` (twice the workers by default) of them are being solved, so the
+    results are yielded while the rest of the boards is still being read and an endless input does not pile up in memory.
+
+    Every worker keeps its heuristic tables between boards. Pattern databases are built here, before any board is handed to
+    the pool, so that the workers only memory map the already saved file instead of building it all at once.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * workers
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # The index and the numbers of the board of every future that has not been yielded yet
+        pending = {}
+        geometries = set()
+        for index, numbers in enumerate(boards):
+            if isinstance(numbers, Exception):
+                yield {"index": index, "error": str(numbers)}
+                continue
+
+            expected_zero_position = len(numbers) - 1 if expected_zero_index == -1 else expected_zero_index
+            if heuristic == Heuristics.pattern_database and (len(numbers), expected_zero_position) not in geometries:
+                try:
+                    PatternDatabase.for_puzzle(get_puzzle(len(numbers), expected_zero_position))
+                except (InvalidBoardError, ValueError) as error:
+                    yield {"index": index, "board": numbers, "error": str(error)}
+                    continue
+                geometries.add((len(numbers), expected_zero_position))
+
+            pending[executor.submit(solve_one, index, numbers, expected_zero_index, heuristic, timeout)] = (index, numbers)
+
+            if len(pending) >= max_pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield get_batch_result(future, *pending.pop(future))
+
+        for future in as_completed(pending):
+            yield get_batch_result(future, *pending[future])
+
+
+def read_boards(fd):
+    """
+    Reads one board per line (numbers separated with spaces), skipping empty lines and lines starting with `#`. A line which
+    is not a list of numbers is yielded as an `InvalidBoardError`, so that `solve_many` reports it and goes on with the rest.
+    """
+    for line_number, line in enumerate(fd, 1):
+        line = line.strip()
+        if line and not line.startswith("#"):
+            try:
+                yield [int(number) for number in line.split()]
+            except ValueError:
+                yield InvalidBoardError(f"Line {line_number} is not a list of numbers: {line}")
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Solves a slide puzzle with IDA*")
+    parser.add_argument("--mode", choices=[SearchMode.path, SearchMode.tree, SearchMode.parallel], default=SearchMode.path)
+    parser.add_argument("--heuristic", choices=list(HEURISTICS), default=Heuristics.manhattan)
+    parser.add_argument("--batch", metavar="PATH", help="solve the boards from a file (one per line, - for stdin) and print JSON lines")
+    parser.add_argument("--zero-index", type=int, default=-1, help="expected zero index for the boards in --batch")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes for --batch and --mode parallel")
+    parser.add_argument("--timeout", type=float, default=None, help="seconds per board for --batch")
+    parser.add_argument("--table-memory", type=int, default=0, help="megabytes for a transposition table (disabled when 0)")
+    parser.add_argument(
+        "--table-policy",
+        choices=[ReplacementPolicy.always, ReplacementPolicy.shallower],
+        default=ReplacementPolicy.shallower,
+    )
+    parser.add_argument("--stats", action="store_true", help="print the statistics of every threshold iteration")
+    args = parser.parse_args()
+
+    if args.batch:
+        with (sys.stdin if args.batch == "-" else open(args.batch, "r")) as fd:
+            for result in solve_many(read_boards(fd), args.zero_index, args.heuristic, args.workers, args.timeout):
+                print(json.dumps(result), flush=True)
+
+        return
+
     n = int(input("Input N: "))
     i = int(input("Input I: "))
     numbers = []
@@ -235,7 +1681,24 @@ def main():
         numbers += [int(number) for number in str(row).split(" ")]
 
     start = time.time()
-    distance, directions = solution(n, i, numbers)
+    transposition_table = None
+    if args.table_memory > 0:
+        transposition_table = TranspositionTable(args.table_memory * 1024 * 1024, args.table_policy)
+
+    stats = None
+    if args.stats:
+        stats = SearchStats(time_heuristic=True, observer=lambda iteration: print(json.dumps(iteration.to_dict())))
+
+    distance, directions = solution(
+        n,
+        i,
+        numbers,
+        mode=args.mode,
+        heuristic=args.heuristic,
+        transposition_table=transposition_table,
+        workers=args.workers,
+        stats=stats,
+    )
     end = time.time()
     # print the expected output
     print(distance)
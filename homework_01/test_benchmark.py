@@ -0,0 +1,36 @@
+from homework_01.benchmark import benchmark, get_instances, InstanceSets
+from homework_01.solution import Heuristics, SearchMode
+
+
+def test_benchmark_reports_runs_and_summary():
+    instances = get_instances([InstanceSets.random_8, InstanceSets.random_walk_15], count=2, walk_length=20)
+    results = list(benchmark(instances, [Heuristics.manhattan], [SearchMode.path]))
+
+    runs = [result for result in results if result["type"] == "run"]
+    summaries = [result for result in results if result["type"] == "summary"]
+
+    assert len(runs) == 4
+    assert all([run["distance"] is not None and run["expanded"] > 0 and run["peak_memory"] > 0 for run in runs])
+    assert [summary["set"] for summary in summaries] == [InstanceSets.random_8, InstanceSets.random_walk_15]
+    assert all([summary["solved"] == 2 for summary in summaries])
+
+
+def test_benchmark_runs_boards_with_the_zero_first():
+    # One move from the goal of Korf's 100, where the zero is the first cell, and a board of the other parity
+    instances = [("korf", 0, [1, 0, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15], 0)]
+    instances += [("korf", 1, [0, 2, 1, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15], 0)]
+    runs = [result for result in benchmark(instances, [Heuristics.manhattan], [SearchMode.path]) if result["type"] == "run"]
+
+    assert runs[0]["distance"] == 1
+    assert runs[1]["distance"] is None and "parity" in runs[1]["error"]
+
+
+def test_get_instances_skips_lines_which_are_not_boards(tmp_path, capsys):
+    path = tmp_path / "instances.txt"
+    path.write_text("1 2 3 4 5 6 0 7 8\n1 2 x\n1 2 3 4 5 6 7 0 8\n")
+
+    instances = get_instances([], count=0, walk_length=0, instances_path=str(path))
+
+    assert [(index, board) for _, index, board, _ in instances] == [(0, [1, 2, 3, 4, 5, 6, 0, 7, 8]), (2, [1, 2, 3, 4, 5, 6, 7, 0, 8])]
+    assert "1 2 x" in capsys.readouterr().err
+    assert [run["distance"] for run in benchmark(instances, [Heuristics.manhattan], [SearchMode.path]) if run["type"] == "run"] == [2, 1]
@@ -1,6 +1,25 @@
+import io
+
 import pytest
 
-from homework_01.solution import solution, Turn, InvalidBoardError
+from homework_01.solution import (
+    solution,
+    Turn,
+    InvalidBoardError,
+    SearchMode,
+    MatrixHelper,
+    pack_numbers,
+    unpack_state,
+    PatternDatabase,
+    Puzzle,
+    Heuristics,
+    create_heuristic,
+    solve_many,
+    read_boards,
+    TranspositionTable,
+    ReplacementPolicy,
+    SearchStats,
+)
 
 
 def test_solution_with_provided_example():
@@ -10,6 +29,13 @@ def test_solution_with_provided_example():
     assert turns == [Turn.left, Turn.left]
 
 
+def test_solution_tree_mode_with_provided_example():
+    turns_count, turns = solution(8, -1, [1, 2, 3, 4, 5, 6, 0, 7, 8], mode=SearchMode.tree)
+
+    assert turns_count == 2
+    assert turns == [Turn.left, Turn.left]
+
+
 def test_solution_already_ordered():
     turns_count, turns = solution(8, -1, [1, 2, 3, 4, 5, 6, 7, 8, 0])
 
@@ -131,3 +157,151 @@ def test_solution_should_throw_invalid_board_error():
 def test_solution_4_by_4_should_throw_invalid_board_error():
     with pytest.raises(InvalidBoardError):
         solution(15, -1, [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 15, 14, 0])
+
+
+@pytest.mark.parametrize("mode", [SearchMode.path, SearchMode.tree])
+@pytest.mark.parametrize("expected_zero_index, numbers", [
+    (0, [1, 2, 3, 0]),
+    (-1, [1, 2, 3, 0, 4]),
+    (-1, [1, 1, 2, 3, 4, 5, 6, 7, 0]),
+    (-1, [1, 2, 3, 4, 5, 6, 7, 9, 0]),
+    (9, [1, 2, 3, 4, 5, 6, 7, 8, 0]),
+])
+def test_solution_rejects_boards_which_cannot_reach_the_goal(mode, expected_zero_index, numbers):
+    # The path search would raise its threshold forever on these boards
+    with pytest.raises(InvalidBoardError):
+        solution(len(numbers) - 1, expected_zero_index, numbers, mode=mode)
+
+
+def test_solution_4_by_4_checks_parity_against_the_goal():
+    # The goal of Korf's 100 has the zero in the first cell, so its row is even
+    assert solution(15, 0, [4, 1, 2, 3, 0, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15]) == (1, [Turn.down])
+
+    with pytest.raises(InvalidBoardError):
+        solution(15, 0, [0, 2, 1, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15])
+
+
+def test_successors_manhattan_score_matches_full_recount():
+    MatrixHelper.expected_zero_position = 15
+
+    for _, successor in MatrixHelper([5, 1, 3, 4, 0, 2, 7, 8, 9, 6, 11, 12, 13, 10, 14, 15]).iter_successor():
+        assert successor.manhattan_score == MatrixHelper(successor.numbers).manhattan_score
+
+
+def test_packed_state_round_trip_with_two_digit_numbers():
+    numbers = [1, 12, 3, 4, 5, 6, 7, 8, 9, 10, 11, 2, 13, 14, 15, 0]
+    swapped = [12, 1, 3, 4, 5, 6, 7, 8, 9, 10, 11, 2, 13, 14, 15, 0]
+
+    assert unpack_state(pack_numbers(numbers), len(numbers)) == numbers
+    assert MatrixHelper(numbers).identifier != MatrixHelper(swapped).identifier
+
+
+def test_solution_with_pattern_database(tmp_path):
+    pattern_database = PatternDatabase.for_puzzle(Puzzle(9, 8), directory=str(tmp_path))
+    numbers = [0, 1, 5, 3, 8, 2, 7, 4, 6]
+
+    assert PatternDatabase.load(next(tmp_path.iterdir())).score(numbers) == pattern_database.score(numbers) == 12
+    assert solution(8, -1, numbers, heuristic=Heuristics.pattern_database, pattern_database=pattern_database) == solution(8, -1, numbers)
+
+
+@pytest.mark.parametrize("heuristic", [Heuristics.manhattan, Heuristics.linear_conflict, Heuristics.walking_distance])
+def test_solution_with_heuristic(heuristic):
+    assert solution(8, -1, [0, 1, 5, 3, 8, 2, 7, 4, 6], heuristic=heuristic)[0] == 20
+    assert solution(15, -1, [1, 0, 3, 4, 5, 2, 7, 8, 9, 6, 11, 12, 13, 10, 14, 15], heuristic=heuristic)[0] == 5
+
+
+@pytest.mark.parametrize("heuristic", [Heuristics.linear_conflict, Heuristics.walking_distance])
+def test_heuristic_move_matches_initial(heuristic):
+    puzzle = Puzzle(16, 15)
+    board = [5, 1, 3, 4, 9, 2, 7, 8, 13, 6, 11, 12, 0, 10, 14, 15]
+    instance = create_heuristic(heuristic, puzzle)
+    state = instance.initial(board)
+
+    for zero_position, moved_zero_position in [(12, 13), (13, 9), (9, 8), (8, 4), (4, 5)]:
+        number = board[moved_zero_position]
+        board[zero_position], board[moved_zero_position] = number, 0
+        state = instance.move(state, board, number, moved_zero_position, zero_position)
+
+        assert instance.estimate(state) == instance.estimate(instance.initial(board))
+
+
+def test_solve_many():
+    boards = [[1, 2, 3, 4, 5, 6, 0, 7, 8], [1, 2, 3, 4, 5, 6, 8, 0, 7], [0, 1, 5, 3, 8, 2, 7, 4, 6]]
+    results = sorted(solve_many(boards, workers=2), key=lambda result: result["index"])
+
+    assert [result.get("distance") for result in results] == [2, None, 20]
+    assert "error" in results[1]
+
+
+def test_solve_many_streams_results_and_reports_errors_per_board():
+    fd = io.StringIO("1 2 3 4 5 6 0 7 8\n# a comment\n1 2 x\n0 1 5 3 8 2 7 4 6\n")
+    results = solve_many(read_boards(fd), workers=1, max_pending=1)
+
+    # With one board in flight its result comes before the rest of the input is read
+    assert next(results)["distance"] == 2
+    assert fd.tell() < len(fd.getvalue())
+    assert next(results) == {"index": 1, "error": "Line 3 is not a list of numbers: 1 2 x"}
+    assert next(results)["distance"] == 20
+
+
+def test_solve_many_reports_unexpected_worker_errors():
+    results = sorted(solve_many([[None] * 9, [1, 2, 3, 4, 5, 6, 0, 7, 8]], workers=1), key=lambda result: result["index"])
+
+    assert results[0]["error"].startswith("TypeError")
+    assert results[1]["distance"] == 2
+
+
+def test_solution_4_by_4_deep_with_pattern_database(tmp_path):
+    groups = ((1, 2, 3), (4, 5, 6), (7, 8, 9), (10, 11, 12), (13, 14, 15))
+    pattern_database = PatternDatabase.for_puzzle(Puzzle(16, 15), groups=groups, directory=str(tmp_path))
+    numbers = [5, 6, 3, 4, 1, 2, 10, 9, 7, 15, 8, 12, 14, 0, 13, 11]
+
+    turns_count, turns = solution(15, -1, numbers, heuristic=Heuristics.pattern_database, pattern_database=pattern_database)
+
+    assert turns_count == len(turns) == 40
+
+
+@pytest.mark.parametrize("policy", [ReplacementPolicy.always, ReplacementPolicy.shallower])
+def test_solution_with_transposition_table(policy):
+    # A tiny table, so that the replacement policy is exercised as well
+    transposition_table = TranspositionTable(memory_limit=64 * TranspositionTable.SLOT_SIZE, policy=policy)
+
+    for numbers in ([0, 1, 5, 3, 8, 2, 7, 4, 6], [2, 3, 0, 5, 1, 8, 4, 7, 6], [8, 6, 7, 2, 5, 4, 3, 0, 1]):
+        assert solution(8, -1, numbers, transposition_table=transposition_table)[0] == solution(8, -1, numbers)[0]
+
+    assert transposition_table.capacity == 64
+    assert transposition_table.replacements > 0
+
+
+@pytest.mark.parametrize("policy", [ReplacementPolicy.always, ReplacementPolicy.shallower])
+@pytest.mark.parametrize("heuristic, numbers, turns_count", [
+    (Heuristics.linear_conflict, [8, 1, 5, 7, 6, 0, 2, 4, 3], 25),
+    (Heuristics.walking_distance, [7, 8, 0, 6, 2, 5, 4, 3, 1], 26),
+])
+def test_solution_with_small_transposition_table_is_optimal(policy, heuristic, numbers, turns_count):
+    # The bounds backed up into the table have to stay admissible when a board is reached from another parent
+    transposition_table = TranspositionTable(memory_limit=500 * TranspositionTable.SLOT_SIZE, policy=policy)
+
+    assert solution(8, -1, numbers, heuristic=heuristic, transposition_table=transposition_table)[0] == turns_count
+
+
+def test_solution_parallel_matches_sequential_length():
+    for numbers in ([1, 2, 3, 4, 5, 6, 7, 8, 0], [1, 2, 3, 4, 5, 6, 0, 7, 8], [2, 3, 0, 5, 1, 8, 4, 7, 6], [8, 6, 7, 2, 5, 4, 3, 0, 1]):
+        turns_count, turns = solution(8, -1, numbers, mode=SearchMode.parallel, workers=2)
+
+        assert turns_count == len(turns) == solution(8, -1, numbers)[0]
+
+
+@pytest.mark.parametrize("mode", [SearchMode.path, SearchMode.parallel])
+def test_solution_reports_stats_per_iteration(mode):
+    iterations = []
+    stats = SearchStats(time_heuristic=True, observer=iterations.append)
+
+    turns_count, _ = solution(8, -1, [8, 6, 7, 2, 5, 4, 3, 0, 1], mode=mode, stats=stats, workers=2)
+
+    assert iterations == stats.iterations
+    assert stats.thresholds == sorted(stats.thresholds) and stats.thresholds[-1] == turns_count
+    assert sum([iteration.expanded for iteration in iterations]) == stats.expanded
+    assert stats.max_depth == turns_count
+    assert 1 < stats.branching_factor < 4
+    assert stats.heuristic_time > 0
@@ -0,0 +1,166 @@
+"""
+Benchmark of the N-Queens solver - solves every board size with every engine and initialization for a few fixed seeds and prints
+one line per run followed by one summary line (with percentiles) per configuration.
+
+Run it from the root directory:
+
+    python -m homework_02.benchmark --sizes 1000 10000 100000 --engines numpy --trials 5 --format csv
+"""
+import argparse
+import csv
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from homework_02.solution import ChessBoard, Engine, Initialization, StepLimitExceededError
+
+SEED = 2021
+
+# The columns of the CSV output - runs and summaries share one table and leave the columns of the other type empty
+FIELDS = [
+    "type",
+    "size",
+    "engine",
+    "initialization",
+    "seed",
+    "trials",
+    "solved",
+    "moves",
+    "time",
+    "peak_memory",
+    "memory_footprint",
+    "error",
+    "moves_p50",
+    "moves_p90",
+    "moves_max",
+    "time_p50",
+    "time_p90",
+    "time_p99",
+    "time_max",
+    "peak_memory_max",
+]
+
+
+def percentile(values: list, percent: float):
+    """
+    Nearest-rank percentile - the smallest value which is not less than `percent` percent of the values
+    """
+    if not values:
+        return None
+
+    values = sorted(values)
+    rank = max(1, -(-len(values) * percent // 100))
+
+    return values[int(rank) - 1]
+
+
+def run(size: int, engine: str, initialization: str, seed: int, max_steps: int, measure_memory: bool) -> dict:
+    result = {}
+
+    random.seed(seed)
+    start = time.perf_counter()
+    chess_board = ChessBoard(size, engine=engine, initialization=initialization)
+    try:
+        moves = chess_board.solve(max_steps=max_steps)
+    except StepLimitExceededError:
+        moves = None
+        result.update(error="step-limit")
+    elapsed = time.perf_counter() - start
+
+    result.update(moves=moves, time=elapsed, peak_memory=None, memory_footprint=chess_board.memory_footprint)
+
+    # Tracing the allocations slows the solver down, so the memory is measured in a separate run with the same seed
+    if measure_memory and moves is not None:
+        del chess_board
+        random.seed(seed)
+        tracemalloc.start()
+        ChessBoard(size, engine=engine, initialization=initialization).solve(max_steps=max_steps)
+        result.update(peak_memory=tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    return result
+
+
+def summarize(runs: list) -> dict:
+    solved = [run for run in runs if run["moves"] is not None]
+    moves = [run["moves"] for run in solved]
+    times = [run["time"] for run in solved]
+    peak_memories = [run["peak_memory"] for run in solved if run["peak_memory"] is not None]
+
+    return {
+        "trials": len(runs),
+        "solved": len(solved),
+        "moves_p50": percentile(moves, 50),
+        "moves_p90": percentile(moves, 90),
+        "moves_max": max(moves, default=None),
+        "time_p50": percentile(times, 50),
+        "time_p90": percentile(times, 90),
+        "time_p99": percentile(times, 99),
+        "time_max": max(times, default=None),
+        "peak_memory_max": max(peak_memories, default=None),
+    }
+
+
+def benchmark(
+        sizes: list,
+        engines: list,
+        initializations: list,
+        trials: int,
+        seed: int = SEED,
+        max_steps: int = None,
+        measure_memory: bool = True,
+):
+    """
+    Yields a dictionary for every run and a summary for every (size, engine, initialization) after its last trial. Trial `i`
+    of every configuration uses the seed `seed + i`, so the configurations solve the same boards.
+    """
+    for size in sizes:
+        for engine in engines:
+            for initialization in initializations:
+                configuration = {"size": size, "engine": engine, "initialization": initialization}
+                runs = []
+
+                for trial in range(trials):
+                    result = run(size, engine, initialization, seed + trial, max_steps, measure_memory)
+                    result = {"type": "run", **configuration, "seed": seed + trial, **result}
+                    runs.append(result)
+
+                    yield result
+
+                yield {"type": "summary", **configuration, **summarize(runs)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks the N-Queens solver and prints JSON lines or CSV")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[100, 1000, 10000], help="board sizes to solve")
+    parser.add_argument("--engines", nargs="+", choices=[Engine.python, Engine.numpy], default=[Engine.python, Engine.numpy])
+    parser.add_argument(
+        "--initializations",
+        nargs="+",
+        choices=[Initialization.stride, Initialization.greedy],
+        default=[Initialization.stride, Initialization.greedy],
+    )
+    parser.add_argument("--trials", type=int, default=5, help="runs per configuration")
+    parser.add_argument("--seed", type=int, default=SEED, help="seed of the first trial")
+    parser.add_argument("--max-steps", type=int, default=None, help="moves after which a run gives up")
+    parser.add_argument("--format", choices=["json", "csv"], default="json")
+    parser.add_argument("--no-memory", action="store_true", help="skip the (slower) peak memory measurement")
+    args = parser.parse_args()
+
+    results = benchmark(args.sizes, args.engines, args.initializations, args.trials, args.seed, args.max_steps, not args.no_memory)
+
+    if args.format == "csv":
+        writer = csv.DictWriter(sys.stdout, fieldnames=FIELDS, restval="")
+        writer.writeheader()
+        for result in results:
+            writer.writerow(result)
+            sys.stdout.flush()
+    else:
+        for result in results:
+            print(json.dumps(result), flush=True)
+
+
+if __name__ == '__main__':
+    main()
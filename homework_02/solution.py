@@ -1,44 +1,314 @@
+import argparse
+import multiprocessing
 import random
+import sys
 import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from operator import add
+
+import numpy as np
+
+
+class Engine:
+    # The board and the counters are kept in lists and every column is scored in a Python loop
+    python = 'python'
+    # The board and the counters are kept in NumPy arrays and all columns of a queen are scored with one vectorized expression
+    numpy = 'numpy'
+
+
+class Initialization:
+    # Every row puts its queen two columns to the right of the previous one (wrapping around)
+    stride = 'stride'
+    # Every row puts its queen on a random unused column that has no conflicts with the queens above it (if one is found)
+    greedy = 'greedy'
+
+
+class OutputFormat:
+    # The whole board - a queen is `*` and an empty cell is `_`
+    grid = 'grid'
+    # The column of the queen of every row, one per line
+    columns = 'columns'
+    # The column of the queen of every row as a little-endian unsigned 32-bit integer
+    binary = 'binary'
+
+
+# About how many characters (or bytes) are written at once by ChessBoard.write
+WRITE_CHUNK_SIZE = 1 << 20
+
+# How many unused columns are tried for a row by the greedy initialization before it takes the least conflicted of them
+GREEDY_CANDIDATES = 128
+
+
+class StepLimitExceededError(Exception):
+    """
+    Thrown when the board is not solved within the allowed number of moves
+    """
+    pass
+
+
+class SolveCancelledError(Exception):
+    """
+    Thrown when solving is stopped from outside, e.g. when another attempt of the portfolio already found a solution
+    """
+    pass
+
+
+def get_integer_type(max_value: int) -> np.dtype:
+    """
+    :return: the narrowest signed integer type which holds every value from -max_value to max_value
+    """
+    for integer_type in (np.int8, np.int16, np.int32, np.int64):
+        if np.iinfo(integer_type).max >= max_value:
+            return np.dtype(integer_type)
+
+    raise ValueError(f"{max_value} does not fit in 64 bits")
+
+
+def estimate_memory_footprint(board_size: int) -> int:
+    """
+    Bytes of the queens and the counters of a board, without the conflicted rows (which depend on the run). The queens and the
+    counters of a column take a value per row, the counters of a diagonal take a value per diagonal (2 * board_size - 1), and
+    there are two counters per line - the queens on it and the xor of their rows.
+    """
+    return get_integer_type(board_size).itemsize * (3 * board_size + 4 * (2 * board_size - 1))
+
+
+class IndexedSet:
+    """
+    Set of integers with O(1) add, discard and random choice - the items are kept in a list and every item knows its index in it
+    """
+
+    def __init__(self):
+        self.__items = []
+        self.__indexes = {}
+
+    def add(self, item: int):
+        if item not in self.__indexes:
+            self.__indexes[item] = len(self.__items)
+            self.__items.append(item)
+
+    def discard(self, item: int):
+        index = self.__indexes.pop(item, None)
+        if index is None:
+            return
+
+        # The last item takes the place of the removed one
+        last_item = self.__items.pop()
+        if last_item != item:
+            self.__items[index] = last_item
+            self.__indexes[last_item] = index
+
+    def choice(self) -> int:
+        return random.choice(self.__items)
+
+    def __contains__(self, item: int) -> bool:
+        return item in self.__indexes
+
+    def __len__(self) -> int:
+        return len(self.__items)
+
+    @property
+    def memory_footprint(self) -> int:
+        """
+        Bytes of the list, the dictionary and the items
+        """
+        return sys.getsizeof(self.__items) + sys.getsizeof(self.__indexes) + sum([sys.getsizeof(item) for item in self.__items])
 
 
 class ChessBoard:
-    def __init__(self, board_size: int):
+    def __init__(self, board_size: int, engine: str = Engine.python, initialization: str = Initialization.stride):
         # When know that queens cannot be on the same row. That's why our algorithm won't even bother to put them on the same row.
         # Our board of queens will be represented with a list of queens where the index and item will be the number of the row (-1) and
         # the value inside that index will be the column (-1) where the queen is positioned
         # self.__queens = list(range(board_size))
         self.__board_size = board_size
-        self.__init_board()
+        self.__engine = engine
+        # Every value on the board (a column, a row, a counter or a xor of rows) fits in this type
+        self.__integer_type = get_integer_type(board_size)
+        self.__init_board(initialization)
+
+    def __init_board(self, initialization: str):
+        if initialization == Initialization.greedy:
+            self.__queens = self.__get_greedy_queens()
+        else:
+            self.__queens = self.__get_stride_queens()
+
+        if self.__engine == Engine.numpy:
+            self.__queens = np.array(self.__queens, dtype=self.__integer_type)
+            self.__init_counters_numpy()
+        else:
+            self.__init_counters()
+
+    def __get_array(self, size: int) -> array:
+        """
+        :return: typed array of `size` zeros of the integer type of the board
+        """
+        return array(self.__integer_type.char, [0]) * size
 
-    def __init_board(self):
-        self.__queens = [0] * self.__board_size
+    def __get_stride_queens(self) -> array:
+        queens = self.__get_array(self.__board_size)
 
-        pos = 1
+        # A board of size 1 has only column 0
+        pos = 1 if self.__board_size > 1 else 0
         for row in range(self.__board_size):
-            self.__queens[row] = pos
+            queens[row] = pos
             pos += 2
             if pos >= self.__board_size:
                 pos = 0
 
-    def __calculate_conflicts(self, queen_row: int, queen_col: int) -> int:
+        return queens
+
+    def __get_greedy_queens(self) -> array:
+        """
+        Places the queens row by row on a random permutation of the columns, so that no two queens share a column. Every row tries up
+        to GREEDY_CANDIDATES of the unused columns and takes the first one whose diagonals are still empty, or else the one with the
+        fewest queens on its diagonals. Only a handful of queens end up in conflict, most of them in the last rows.
+        """
+        board_size = self.__board_size
+        # columns[row:] are the columns that are not used yet
+        columns = array(self.__integer_type.char, range(board_size))
+        main_diagonals = self.__get_array(2 * board_size - 1)
+        anti_diagonals = self.__get_array(2 * board_size - 1)
+
+        for row in range(board_size):
+            unused_count = board_size - row
+            best_index = row
+            best_conflicts = board_size
+
+            # random.random() is a lot faster than random.randrange() and is uniform enough for picking columns
+            for _ in range(GREEDY_CANDIDATES if unused_count > GREEDY_CANDIDATES else unused_count):
+                index = row + int(random.random() * unused_count)
+                col = columns[index]
+                conflicts = main_diagonals[row - col + board_size - 1] + anti_diagonals[row + col]
+
+                if conflicts < best_conflicts:
+                    best_index = index
+                    best_conflicts = conflicts
+                    if conflicts == 0:
+                        break
+
+            columns[row], columns[best_index] = columns[best_index], columns[row]
+            col = columns[row]
+            main_diagonals[row - col + board_size - 1] += 1
+            anti_diagonals[row + col] += 1
+
+        return columns
+
+    def __init_counters(self):
+        # How many queens there are on every column, main diagonal (row - col is constant, shifted by board_size - 1 so that it
+        # starts from 0) and anti diagonal (row + col is constant)
+        self.__columns = self.__get_array(self.__board_size)
+        self.__main_diagonals = self.__get_array(2 * self.__board_size - 1)
+        self.__anti_diagonals = self.__get_array(2 * self.__board_size - 1)
+        # The xor of the rows of the queens on every line - when there is only one queen on a line this is its row. Unlike a sum
+        # it never gets bigger than the rows, so it fits in the same integer type
+        self.__column_rows = self.__get_array(self.__board_size)
+        self.__main_diagonal_rows = self.__get_array(2 * self.__board_size - 1)
+        self.__anti_diagonal_rows = self.__get_array(2 * self.__board_size - 1)
+
+        for row, col in enumerate(self.__queens):
+            self.__add_queen(row, col, 1)
+
+        # The rows of all queens that are in conflict with at least one other queen
+        self.__conflicted_rows = IndexedSet()
+        for row in range(self.__board_size):
+            self.__update_conflicted(row)
+
+    def __init_counters_numpy(self):
+        """
+        Same as __init_counters, but every counter is counted with one `bincount` (or `bitwise_xor.at`) over all queens
+        """
+        size = 2 * self.__board_size - 1
+        rows = np.arange(self.__board_size, dtype=np.int64)
+        # The indexes are calculated in 64 bits, the diagonals do not fit in the integer type of the board
+        queens = self.__queens.astype(np.int64)
+        main_diagonals = rows - queens + self.__board_size - 1
+        anti_diagonals = rows + queens
+
+        self.__columns = np.bincount(queens, minlength=self.__board_size).astype(self.__integer_type)
+        self.__main_diagonals = np.bincount(main_diagonals, minlength=size).astype(self.__integer_type)
+        self.__anti_diagonals = np.bincount(anti_diagonals, minlength=size).astype(self.__integer_type)
+
+        rows = rows.astype(self.__integer_type)
+        self.__column_rows = np.zeros(self.__board_size, dtype=self.__integer_type)
+        self.__main_diagonal_rows = np.zeros(size, dtype=self.__integer_type)
+        self.__anti_diagonal_rows = np.zeros(size, dtype=self.__integer_type)
+        np.bitwise_xor.at(self.__column_rows, queens, rows)
+        np.bitwise_xor.at(self.__main_diagonal_rows, main_diagonals, rows)
+        np.bitwise_xor.at(self.__anti_diagonal_rows, anti_diagonals, rows)
+
+        conflicted = (
+            (self.__columns[queens] > 1)
+            | (self.__main_diagonals[main_diagonals] > 1)
+            | (self.__anti_diagonals[anti_diagonals] > 1)
+        )
+        self.__conflicted_rows = IndexedSet()
+        for row in np.flatnonzero(conflicted).tolist():
+            self.__conflicted_rows.add(row)
+
+    def __add_queen(self, queen_row: int, queen_col: int, count: int):
+        """
+        Adds `count` (1 or -1 to remove it) to the counters of the cell
+        """
+        main_diagonal = queen_row - queen_col + self.__board_size - 1
+        anti_diagonal = queen_row + queen_col
+
+        self.__columns[queen_col] += count
+        self.__main_diagonals[main_diagonal] += count
+        self.__anti_diagonals[anti_diagonal] += count
+
+        # Adding and removing a row from a xor is the same
+        self.__column_rows[queen_col] ^= queen_row
+        self.__main_diagonal_rows[main_diagonal] ^= queen_row
+        self.__anti_diagonal_rows[anti_diagonal] ^= queen_row
+
+    def __update_conflicted(self, queen_row: int):
+        """
+        Adds the queen to the conflicted rows if it shares any line with another queen and removes it otherwise
         """
-        Calculates all conflicts on the board with a given queen
+        # NumPy would calculate the diagonals in the (too narrow) integer type of the board
+        queen_col = int(self.__queens[queen_row])
+
+        if (
+            self.__columns[queen_col] > 1
+            or self.__main_diagonals[queen_row - queen_col + self.__board_size - 1] > 1
+            or self.__anti_diagonals[queen_row + queen_col] > 1
+        ):
+            self.__conflicted_rows.add(queen_row)
+        else:
+            self.__conflicted_rows.discard(queen_row)
+
+    def __get_lines(self, queen_row: int, queen_col: int) -> list:
         """
-        conflicts_count = 0
+        :return: (counters, xors of the rows, index) of the column, the main diagonal and the anti diagonal of the cell
+        """
+        return [
+            (self.__columns, self.__column_rows, queen_col),
+            (self.__main_diagonals, self.__main_diagonal_rows, queen_row - queen_col + self.__board_size - 1),
+            (self.__anti_diagonals, self.__anti_diagonal_rows, queen_row + queen_col),
+        ]
 
-        for other_queen_row in range(len(self.__queens)):
-            # If the other queen row (index) is equal to the queen_row (index) we continue because this is the same queen
-            if other_queen_row == queen_row:
-                continue
+    def __place_queen(self, queen_row: int, queen_col: int):
+        """
+        Moves the queen of the row to the column and updates the counters and the conflicted rows.
 
-            other_queen_col = self.__queens[other_queen_row]
+        Only the queens on the lines that the queen leaves or enters can change their state, and only when they are alone there
+        before the queen enters or after it leaves - a line with two or more queens keeps them all in conflict.
+        """
+        old_col = int(self.__queens[queen_row])
+        self.__add_queen(queen_row, old_col, -1)
+        for counters, rows, index in self.__get_lines(queen_row, old_col):
+            if counters[index] == 1:
+                self.__update_conflicted(int(rows[index]))
 
-            # If they are on the same column or they are position in diagonal we increment the conflicts counter
-            if self.__queens[other_queen_row] == queen_col or abs(queen_col - other_queen_col) == abs(queen_row - other_queen_row):
-                conflicts_count += 1
+        for counters, rows, index in self.__get_lines(queen_row, queen_col):
+            if counters[index] == 1:
+                self.__conflicted_rows.add(int(rows[index]))
 
-        return conflicts_count
+        self.__queens[queen_row] = queen_col
+        self.__add_queen(queen_row, queen_col, 1)
+        self.__update_conflicted(queen_row)
 
     def __move_queen(self, queen_row: int):
         """
@@ -47,82 +317,283 @@ class ChessBoard:
         * If the queen is already on that place nothing happens
         ** If there are multiple columns where the conflicts count is minimized then a random one is picked between them
         """
-        # At the beginning the min conflict is equal to the board size i.e. all queens are in conflict
-        current_min_conflict = self.__board_size
-        # And there are no available columns that will minimize the conflict of that queen
-        columns_with_minimal_conflicts = []
-
-        # We iterate over all columns on the board
-        for other_column in range(self.__board_size):
-            # If other column is equal to the current column of the queen nothing happens
-            if other_column == self.__queens[queen_row]:
-                continue
-            # And calculate the possible conflicts count if the queen was placed there
-            other_min_conflict = self.__calculate_conflicts(queen_row=queen_row, queen_col=other_column)
-            if other_min_conflict < current_min_conflict:
-                # If the found conflict count is less than the existing minconflict count then we want this to be our new minconflict count
-                columns_with_minimal_conflicts = [other_column]
-                current_min_conflict = other_min_conflict
-            elif other_min_conflict == current_min_conflict:
-                # If the found conflict count is equal to the existing minconflict count we want to add the new column to the list of
-                # available columns that minimizes the conflicts
+        if self.__engine == Engine.numpy:
+            self.__move_queen_numpy(queen_row)
+            return
+
+        # The conflicts of every column are summed from slices of the counters (see `__move_queen_numpy`) with `map`, and the minimum
+        # and its columns are found with `min`, `count` and `index` - all of them loop in C instead of calling a method per column
+        board_size = self.__board_size
+        main_diagonals = self.__main_diagonals[queen_row:queen_row + board_size]
+        main_diagonals.reverse()
+        conflicts = list(map(add, map(add, self.__columns, main_diagonals), self.__anti_diagonals[queen_row:queen_row + board_size]))
+
+        # The queen must leave its current column, so that column is never the minimum
+        conflicts[self.__queens[queen_row]] = board_size
+        current_min_conflict = min(conflicts)
+
+        # If all columns are as bad as the board size i.e. all queens are in conflict nothing happens
+        if current_min_conflict < board_size:
+            # The columns that minimize the conflicts, in order
+            columns_with_minimal_conflicts = []
+            other_column = -1
+            for _ in range(conflicts.count(current_min_conflict)):
+                other_column = conflicts.index(current_min_conflict, other_column + 1)
                 columns_with_minimal_conflicts.append(other_column)
 
-        # Finally if the list of columns that will minimize the conflicts is not empty
-        if columns_with_minimal_conflicts:
             # We change the position of the queen to a randomly selected column (from the minimization list)
-            self.__queens[queen_row] = random.choice(columns_with_minimal_conflicts)
+            self.__place_queen(queen_row, random.choice(columns_with_minimal_conflicts))
 
-    def solve(self) -> int:
+    def __move_queen_numpy(self, queen_row: int):
+        """
+        Same as __move_queen, but the conflicts of all columns are calculated at once
+        """
+        # The main diagonal of column `col` is `queen_row - col + board_size - 1`, so the main diagonals of the columns 0 ... N - 1
+        # are the slice [queen_row, queen_row + board_size) reversed, and the anti diagonals are the same slice in order
+        main_diagonals = self.__main_diagonals[queen_row:queen_row + self.__board_size][::-1]
+        anti_diagonals = self.__anti_diagonals[queen_row:queen_row + self.__board_size]
+        conflicts = self.__columns + main_diagonals + anti_diagonals
+
+        # The queen must leave its current column, so that column is never the minimum
+        conflicts[self.__queens[queen_row]] = self.__board_size
+        current_min_conflict = conflicts.min()
+
+        if current_min_conflict < self.__board_size:
+            columns_with_minimal_conflicts = np.flatnonzero(conflicts == current_min_conflict)
+            other_column = int(columns_with_minimal_conflicts[random.randrange(len(columns_with_minimal_conflicts))])
+            self.__place_queen(queen_row, other_column)
+
+    def solve(self, max_steps: int = None, stop_event=None) -> int:
         """
         Solves the board - finds a solution where all queens won't be in conflict
+
+        :param max_steps: raise `StepLimitExceededError` when the board is not solved after that many moves
+        :param stop_event: raise `SolveCancelledError` as soon as this event is set
         """
         # This function will return the number of moves need to order the board (and also will move the queens)
         moves = 0
         while True:
-            # We calculate the sum of all conflict count per queen on the board
-            conflicts = sum([self.__calculate_conflicts(queen_row, self.__queens[queen_row]) for queen_row in range(self.__board_size)])
-
-            # If that sum is equal to 0 then all queens are "in peace" and the solution is over
-            if conflicts == 0:
+            # If there are no conflicted queens then all queens are "in peace" and the solution is over
+            if not self.__conflicted_rows:
                 # We return the count of moves needed to solve the board
                 return moves
 
-            # If the board has conflicts (not solved yet) we select a random a queen and then we move it to the position with min conflicts
-            queen_to_move = random.randint(0, self.__board_size - 1)
+            # If the board has conflicts (not solved yet) we select a random conflicted queen and then we move it to the position with
+            # min conflicts
+            if max_steps is not None and moves >= max_steps:
+                raise StepLimitExceededError(f"The board was not solved in {max_steps} moves")
+            if stop_event is not None and stop_event.is_set():
+                raise SolveCancelledError("Solving was cancelled")
+
+            queen_to_move = self.__conflicted_rows.choice()
             self.__move_queen(queen_to_move)
 
             # And finally we need to increment the moves counter with one
             moves += 1
 
+    @property
+    def memory_footprint(self) -> int:
+        """
+        Bytes of the queens, the counters and the conflicted rows
+        """
+        buffers = [
+            self.__queens,
+            self.__columns,
+            self.__main_diagonals,
+            self.__anti_diagonals,
+            self.__column_rows,
+            self.__main_diagonal_rows,
+            self.__anti_diagonal_rows,
+        ]
+
+        return sum([len(buffer) * buffer.itemsize for buffer in buffers]) + self.__conflicted_rows.memory_footprint
+
+    def __get_grid_row(self, queen_col: int) -> str:
+        return "_ " * queen_col + "*" + " _" * (self.__board_size - queen_col - 1)
+
+    def write(self, fd, output_format: str = OutputFormat.grid):
+        """
+        Writes the board in chunks of about WRITE_CHUNK_SIZE, so the whole board is never kept in memory.
+
+        :param fd: text file for the grid and the columns, binary file for the binary format
+        """
+        if output_format == OutputFormat.grid:
+            rows_per_chunk = max(1, WRITE_CHUNK_SIZE // (2 * self.__board_size))
+        elif output_format == OutputFormat.columns:
+            rows_per_chunk = max(1, WRITE_CHUNK_SIZE // (len(str(self.__board_size)) + 1))
+        elif output_format == OutputFormat.binary:
+            rows_per_chunk = WRITE_CHUNK_SIZE // 4
+        else:
+            raise ValueError(f"Unknown output format {output_format}")
+
+        for start in range(0, self.__board_size, rows_per_chunk):
+            queens = self.__queens[start:start + rows_per_chunk].tolist()
+
+            if output_format == OutputFormat.grid:
+                fd.write("".join([self.__get_grid_row(queen_col) + "\n" for queen_col in queens]))
+            elif output_format == OutputFormat.columns:
+                fd.write("".join([f"{queen_col}\n" for queen_col in queens]))
+            else:
+                fd.write(np.asarray(queens, dtype="<u4").tobytes())
+
     def __str__(self):
         rows = []
 
-        for queen_col in self.__queens:
-            rows.append("_ " * queen_col + "*" + " _" * (self.__board_size - queen_col - 1))
+        for queen_col in self.__queens.tolist():
+            rows.append(self.__get_grid_row(queen_col))
 
         return "\n".join(rows)
 
 
-def solution(board_width: int) -> tuple:
-    chess_board = ChessBoard(board_width)
+# Set in the worker processes of `solve_portfolio`
+worker_stop_event = None
+
+
+def init_portfolio_worker(stop_event):
+    global worker_stop_event
+    worker_stop_event = stop_event
+
+
+def solve_attempt(board_width: int, engine: str, initialization: str, seed: int, max_steps: int):
+    """
+    Solves a board with its own seed in a worker process of `solve_portfolio`.
+
+    :return: (moves, solved board), or None when the attempt hit its step limit or was cancelled
+    """
+    random.seed(seed)
+    chess_board = ChessBoard(board_width, engine=engine, initialization=initialization)
+
+    try:
+        return chess_board.solve(max_steps=max_steps, stop_event=worker_stop_event), chess_board
+    except (StepLimitExceededError, SolveCancelledError):
+        return None
+
 
-    return chess_board.solve(), str(chess_board)
+def solve_portfolio(
+        board_width: int,
+        engine: str = Engine.python,
+        initialization: str = Initialization.stride,
+        attempts: int = 4,
+        workers: int = None,
+        max_steps: int = None,
+        seed: int = 0,
+) -> tuple:
+    """
+    Runs `attempts` independently seeded attempts (seeds `seed`, `seed` + 1, ...) in a pool of `workers` processes. The first
+    solution wins - the pending attempts are cancelled and the running ones are stopped.
+
+    The moves of min-conflicts have a heavy tail, so a few attempts with a step limit finish more predictably than a single one.
+
+    :return: (moves, solved board)
+    """
+    stop_event = multiprocessing.Event()
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_portfolio_worker, initargs=(stop_event,)) as executor:
+        futures = [
+            executor.submit(solve_attempt, board_width, engine, initialization, seed + attempt, max_steps)
+            for attempt in range(attempts)
+        ]
+
+        for future in as_completed(futures):
+            result = future.result()
+            if result is not None:
+                stop_event.set()
+                for other in futures:
+                    other.cancel()
+
+                return result
+
+    raise StepLimitExceededError(f"None of the {attempts} attempts solved the board in {max_steps} moves")
+
+
+def solution(
+        board_width: int,
+        engine: str = Engine.python,
+        initialization: str = Initialization.stride,
+        attempts: int = 1,
+        workers: int = None,
+        max_steps: int = None,
+        seed: int = None,
+) -> tuple:
+    """
+    Solves the board in this process, or with `solve_portfolio` when there is more than one attempt
+
+    :return: (moves, solved board) - the board is rendered only when it is written or converted to a string
+    """
+    if attempts > 1:
+        # Without a seed every run draws its own seeds, so the restarts differ from run to run like a single attempt does
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        return solve_portfolio(board_width, engine, initialization, attempts, workers, max_steps, seed)
+
+    if seed is not None:
+        random.seed(seed)
+    chess_board = ChessBoard(board_width, engine=engine, initialization=initialization)
+
+    return chess_board.solve(max_steps=max_steps), chess_board
 
 
 def main():
-    board_width = int(input("Input board width: "))
+    parser = argparse.ArgumentParser()
+    parser.add_argument("board_width", nargs="?", type=int, help="Board width, asked for when it is not given")
+    parser.add_argument(
+        "--engine",
+        help="How the columns of a queen are scored - numpy by default, which solves N=10 000 in well under a second",
+        choices=[Engine.python, Engine.numpy],
+        default=Engine.numpy,
+    )
+    parser.add_argument(
+        "--init",
+        help="How the queens are placed before solving",
+        choices=[Initialization.stride, Initialization.greedy],
+        default=Initialization.stride,
+    )
+    parser.add_argument("--attempts", type=int, default=1, help="Independently seeded attempts, the first solution wins")
+    parser.add_argument("--workers", type=int, default=None, help="Processes for the attempts (one per CPU by default)")
+    parser.add_argument("--max-steps", type=int, default=None, help="Moves after which an attempt gives up")
+    parser.add_argument("--seed", type=int, default=None, help="Seed of the (first) attempt")
+    parser.add_argument("--estimate-memory", action="store_true", help="Only print the memory the board would take")
+    parser.add_argument(
+        "--format",
+        help="Print the board in this format",
+        choices=[OutputFormat.grid, OutputFormat.columns, OutputFormat.binary],
+    )
+    parser.add_argument("--output", help="Write the board to this file instead of the standard output")
+    args = parser.parse_args()
+
+    board_width = args.board_width if args.board_width is not None else int(input("Input board width: "))
 
     if board_width <= 0:
         raise ValueError("The board width cannot be less than zero")
 
+    if args.estimate_memory:
+        memory = estimate_memory_footprint(board_width) / 2 ** 20
+        print("Memory of the board in MB (without the conflicted rows): " + "{:.2f}".format(memory))
+        return
+
     start = time.time()
-    moves, board = solution(board_width)
+    moves, board = solution(
+        board_width,
+        engine=args.engine,
+        initialization=args.init,
+        attempts=args.attempts,
+        workers=args.workers,
+        max_steps=args.max_steps,
+        seed=args.seed,
+    )
     end = time.time()
 
-    # print(board)
     print("Execution time in seconds: " + "{:.2f}".format(end - start))
     print(f"Moves needed to solve the board: {moves}")
+    print("Memory of the board in MB: " + "{:.2f}".format(board.memory_footprint / 2 ** 20))
+
+    if args.format:
+        mode = "wb" if args.format == OutputFormat.binary else "w"
+        if args.output:
+            with open(args.output, mode) as fd:
+                board.write(fd, args.format)
+        else:
+            sys.stdout.flush()
+            board.write(sys.stdout.buffer if mode == "wb" else sys.stdout, args.format)
 
 
 if __name__ == '__main__':
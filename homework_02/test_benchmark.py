@@ -0,0 +1,29 @@
+from homework_02.benchmark import benchmark, percentile
+from homework_02.solution import Engine, Initialization
+
+
+def test_benchmark_reports_runs_and_summary():
+    results = list(benchmark([50, 100], [Engine.python, Engine.numpy], [Initialization.greedy], trials=2))
+
+    runs = [result for result in results if result["type"] == "run"]
+    summaries = [result for result in results if result["type"] == "summary"]
+
+    assert len(runs) == 8
+    assert all([run["moves"] is not None and run["peak_memory"] > 0 and run["memory_footprint"] > 0 for run in runs])
+    assert [(summary["size"], summary["engine"]) for summary in summaries] == [
+        (50, Engine.python), (50, Engine.numpy), (100, Engine.python), (100, Engine.numpy),
+    ]
+    assert all([summary["solved"] == 2 for summary in summaries])
+
+
+def test_benchmark_reports_step_limit():
+    results = list(benchmark([200], [Engine.python], [Initialization.stride], trials=1, max_steps=1, measure_memory=False))
+
+    assert results[0]["error"] == "step-limit" and results[0]["moves"] is None
+    assert results[1]["solved"] == 0 and results[1]["time_p50"] is None
+
+
+def test_percentile():
+    assert percentile([5, 1, 4, 2, 3], 50) == 3
+    assert percentile([5, 1, 4, 2, 3], 90) == 5
+    assert percentile([], 50) is None
@@ -0,0 +1,148 @@
+import io
+import random
+
+import numpy as np
+import pytest
+
+from homework_02 import solution
+from homework_02.solution import ChessBoard, Engine, Initialization, OutputFormat, StepLimitExceededError, solve_portfolio
+
+
+def get_conflicted_rows(queens: list) -> set:
+    """
+    Counts the queens on every line again and returns the rows of the queens which share a line with another one
+    """
+    lines = [(("column", col), ("main diagonal", row - col), ("anti diagonal", row + col)) for row, col in enumerate(queens)]
+    counts = {}
+    for queen_lines in lines:
+        for line in queen_lines:
+            counts[line] = counts.get(line, 0) + 1
+
+    return {row for row, queen_lines in enumerate(lines) if any([counts[line] > 1 for line in queen_lines])}
+
+
+@pytest.mark.parametrize("engine", [Engine.python, Engine.numpy])
+def test_conflicted_rows_match_full_recount_after_random_moves(engine):
+    random.seed(2021)
+    board = ChessBoard(40, engine=engine)
+
+    for _ in range(500):
+        board._ChessBoard__place_queen(random.randrange(40), random.randrange(40))
+        conflicted_rows = board._ChessBoard__conflicted_rows
+
+        assert {row for row in range(40) if row in conflicted_rows} == get_conflicted_rows(board._ChessBoard__queens.tolist())
+        assert len(conflicted_rows) == len(get_conflicted_rows(board._ChessBoard__queens.tolist()))
+
+
+@pytest.mark.parametrize("engine", [Engine.python, Engine.numpy])
+def test_solve_leaves_no_conflicts(engine):
+    random.seed(2021)
+    board = ChessBoard(100, engine=engine)
+    board.solve()
+
+    assert get_conflicted_rows(board._ChessBoard__queens.tolist()) == set()
+
+
+@pytest.mark.parametrize("initialization", [Initialization.stride, Initialization.greedy])
+def test_engines_make_identical_moves_for_the_same_seed(initialization):
+    boards = []
+    for engine in (Engine.python, Engine.numpy):
+        random.seed(2021)
+        board = ChessBoard(200, engine=engine, initialization=initialization)
+        boards.append((board.solve(), board._ChessBoard__queens.tolist()))
+
+    assert boards[0] == boards[1]
+
+
+@pytest.mark.parametrize("engine", [Engine.python, Engine.numpy])
+@pytest.mark.parametrize("board_size", [1, 7, 1000])
+def test_greedy_initialization_is_a_column_permutation(engine, board_size):
+    random.seed(2021)
+    board = ChessBoard(board_size, engine=engine, initialization=Initialization.greedy)
+
+    assert sorted(board._ChessBoard__queens.tolist()) == list(range(board_size))
+
+
+@pytest.mark.parametrize("engine", [Engine.python, Engine.numpy])
+def test_write_round_trips_in_every_format(engine, monkeypatch):
+    # A tiny chunk, so that the board is written in many chunks
+    monkeypatch.setattr(solution, "WRITE_CHUNK_SIZE", 64)
+    random.seed(2021)
+    board = ChessBoard(300, engine=engine)
+    board.solve()
+    queens = board._ChessBoard__queens.tolist()
+
+    grid = io.StringIO()
+    board.write(grid, OutputFormat.grid)
+    assert grid.getvalue() == str(board) + "\n"
+    assert [row.split().index("*") for row in grid.getvalue().splitlines()] == queens
+
+    columns = io.StringIO()
+    board.write(columns, OutputFormat.columns)
+    assert [int(line) for line in columns.getvalue().splitlines()] == queens
+
+    binary = io.BytesIO()
+    board.write(binary, OutputFormat.binary)
+    assert np.frombuffer(binary.getvalue(), dtype="<u4").tolist() == queens
+
+
+def test_write_rejects_unknown_format():
+    with pytest.raises(ValueError):
+        ChessBoard(8).write(io.StringIO(), "unknown")
+
+
+@pytest.mark.parametrize("engine", [Engine.python, Engine.numpy])
+@pytest.mark.parametrize("initialization", [Initialization.stride, Initialization.greedy])
+def test_xor_counters_stay_in_sync(engine, initialization):
+    random.seed(2021)
+    board = ChessBoard(40, engine=engine, initialization=initialization)
+
+    for _ in range(200):
+        board._ChessBoard__place_queen(random.randrange(40), random.randrange(40))
+
+        # The xor of the rows of the queens on every line, counted again from the queens
+        column_rows, main_diagonal_rows, anti_diagonal_rows = [0] * 40, [0] * 79, [0] * 79
+        for row, col in enumerate(board._ChessBoard__queens.tolist()):
+            column_rows[col] ^= row
+            main_diagonal_rows[row - col + 39] ^= row
+            anti_diagonal_rows[row + col] ^= row
+
+        assert board._ChessBoard__column_rows.tolist() == column_rows
+        assert board._ChessBoard__main_diagonal_rows.tolist() == main_diagonal_rows
+        assert board._ChessBoard__anti_diagonal_rows.tolist() == anti_diagonal_rows
+
+
+@pytest.mark.parametrize("board_size", [1, 4, 8, 100])
+def test_solution_places_queens_in_peace(board_size):
+    moves, board = solution.solution(board_size, seed=2021)
+    queens = board._ChessBoard__queens.tolist()
+
+    assert get_conflicted_rows(queens) == set()
+    # Every line holds at most one queen, and the counters know which
+    assert board._ChessBoard__columns.tolist() == [1] * board_size
+    assert sum(board._ChessBoard__main_diagonals.tolist()) == sum(board._ChessBoard__anti_diagonals.tolist()) == board_size
+    assert all([board._ChessBoard__main_diagonals[row - col + board_size - 1] == 1 for row, col in enumerate(queens)])
+    assert all([board._ChessBoard__anti_diagonals[row + col] == 1 for row, col in enumerate(queens)])
+
+
+def test_solve_portfolio_returns_a_solved_board():
+    moves, board = solve_portfolio(200, Engine.numpy, Initialization.greedy, attempts=3, workers=2)
+
+    assert sorted(board._ChessBoard__queens.tolist()) == list(range(200))
+    assert get_conflicted_rows(board._ChessBoard__queens.tolist()) == set()
+
+
+def test_solve_portfolio_raises_when_no_attempt_is_solved():
+    with pytest.raises(StepLimitExceededError):
+        solve_portfolio(200, attempts=2, workers=2, max_steps=1)
+
+
+def test_solution_draws_the_portfolio_seeds_when_none_is_given(monkeypatch):
+    seeds = []
+    monkeypatch.setattr(solution, "solve_portfolio", lambda *args: seeds.append(args[-1]))
+
+    solution.solution(100, attempts=2)
+    solution.solution(100, attempts=2)
+    solution.solution(100, attempts=2, seed=7)
+
+    assert seeds[0] != seeds[1] and seeds[2] == 7
@@ -1,8 +1,20 @@
+import argparse
+import io
+import math
+import multiprocessing
+import pathlib
+import queue
 import random
 import itertools
+import zipfile
+from array import array
 
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from functools import cached_property
 
+import numpy as np
+
 
 class City:
     def __init__(self, pos_width: float, pos_height: float):
@@ -47,29 +59,393 @@ class Grid:
         """
         cities = set()
 
-        # Presented test case
-        # cities.add(City(0.190032E-03, -0.285946E-03))
-        # cities.add(City(383.458, -0.608756E-03))
-        # cities.add(City(-27.0206, -282.758))
-        # cities.add(City(335.751, -269.577))
-        # cities.add(City(69.4331, -246.780))
-        # cities.add(City(168.521, 31.4012))
-        # cities.add(City(320.350, -160.900))
-        # cities.add(City(179.933, -318.031))
-        # cities.add(City(492.671, -131.563))
-        # cities.add(City(112.198, -110.561))
-        # cities.add(City(306.320, -108.090))
-        # cities.add(City(217.343, -447.089))
-
+        # The presented test case is in data/uk12_xy.csv (see `load_instance`)
         while len(cities) != cities_count:
             cities.add(cls.generate_random_city())
 
         return cities
 
 
+class Cities:
+    def __init__(self, coordinates: np.ndarray, distance_matrix: bool = True):
+        """
+        Numbers the cities by their row in `coordinates` (N x 2) - the routes are arrays of these numbers
+
+        :param distance_matrix: precompute the distance between every two cities - it takes 8 * N^2 bytes, so without it (for
+        big instances) the distances are calculated from the coordinates every time
+        """
+        self.coordinates = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+        self.distances = self.get_distances(self.coordinates) if distance_matrix else None
+
+    @classmethod
+    def from_cities(cls, cities: list, distance_matrix: bool = True):
+        return cls(np.array([(city.pos_width, city.pos_height) for city in cities], dtype=np.float64), distance_matrix)
+
+    @staticmethod
+    def get_distances(coordinates: np.ndarray) -> np.ndarray:
+        """
+        Calculates the distance between every two cities at once (the same way as `City.distance`)
+        """
+        differences = coordinates[:, np.newaxis, :] - coordinates[np.newaxis, :, :]
+
+        return np.sqrt((differences ** 2).sum(axis=2))
+
+    def get_distance(self, city_a: int, city_b: int) -> float:
+        if self.distances is not None:
+            return float(self.distances[city_a, city_b])
+
+        return float(np.sqrt(((self.coordinates[city_a] - self.coordinates[city_b]) ** 2).sum()))
+
+    def get_route_distance(self, route: np.ndarray) -> float:
+        """
+        Sums the distances of all consecutive pairs of cities of the route at once
+        """
+        if self.distances is not None:
+            return float(self.distances[route[:-1], route[1:]].sum())
+
+        differences = np.diff(self.coordinates[route], axis=0)
+        return float(np.sqrt((differences ** 2).sum(axis=1)).sum())
+
+    def __getitem__(self, index: int) -> City:
+        return City(*self.coordinates[index].tolist())
+
+    def __len__(self):
+        return len(self.coordinates)
+
+
+# The shortest known (open) paths of the instances by name - the same distance as `Route.distance`. The published optima of TSPLIB
+# are closed tours with rounded distances, which can not be compared with it
+KNOWN_OPTIMAL_DISTANCES = {
+    "uk12": 1595.7385220330236,
+}
+
+DATA_PATH = pathlib.Path(__file__).parent / "data"
+
+
+def read_coordinates(lines) -> np.ndarray:
+    """
+    Reads the coordinates of the cities line by line, from either
+
+    * TSPLIB - `NAME: ...` and the other keywords, then `NODE_COORD_SECTION` with `number x y` on every line and `EOF`
+    * a coordinates file (as `uk12_xy.csv` from UK_TSP.zip) - `x,y` or `x y` on every line
+
+    :return: N x 2 array
+    """
+    coordinates = array("d")
+    in_node_section = None
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        if in_node_section is None:
+            # TSPLIB files start with keywords, the coordinate files start with numbers
+            in_node_section = not line[0].isalpha()
+
+        if not in_node_section:
+            keyword, _, value = line.partition(":")
+            keyword, value = keyword.strip().upper(), value.strip()
+
+            if keyword == "EDGE_WEIGHT_TYPE" and value != "EUC_2D":
+                raise ValueError(f"Only EUC_2D instances are supported, not {value}")
+            if keyword == "NODE_COORD_SECTION":
+                in_node_section = True
+            continue
+
+        if line == "EOF" or line[0].isalpha():
+            # The coordinates are followed by the end of the file or another section
+            break
+
+        values = line.replace(",", " ").split()
+        coordinates.extend([float(value) for value in values[-2:]])
+
+    return np.frombuffer(coordinates, dtype=np.float64).reshape(-1, 2)
+
+
+def load_instance(path: str, member: str = None) -> tuple:
+    """
+    Loads an instance from a TSPLIB (`.tsp`) or a coordinates (`_xy.csv`) file, or from a member of a `.zip` archive, which is
+    read without extracting it. When there is no `member` the first `.tsp` or `_xy.csv` file of the archive is read.
+
+    :return: (name of the instance, coordinates)
+    """
+    path = pathlib.Path(path)
+
+    if path.suffix.lower() == ".zip":
+        with zipfile.ZipFile(path) as archive:
+            if member is None:
+                members = [name for name in archive.namelist() if name.lower().endswith((".tsp", "_xy.csv"))]
+                if not members:
+                    raise ValueError(f"There is no .tsp or _xy.csv file in {path}")
+                member = members[0]
+
+            with archive.open(member) as fd:
+                coordinates = read_coordinates(io.TextIOWrapper(fd, encoding="utf-8"))
+        name = pathlib.PurePosixPath(member).name
+    else:
+        with open(path, "r") as fd:
+            coordinates = read_coordinates(fd)
+        name = path.name
+
+    # uk12_xy.csv and uk12.tsp are both the instance uk12
+    name = name.rsplit(".", 1)[0]
+    if name.endswith("_xy"):
+        name = name[:-len("_xy")]
+
+    return name, coordinates
+
+
+class SpatialGrid:
+    """
+    Uniform grid over the cities for nearest neighbour queries - the cells are about as big as CITIES_PER_CELL cities, so only a
+    few cells around a city are searched for its nearest neighbours
+    """
+    CITIES_PER_CELL = 2
+
+    def __init__(self, coordinates: np.ndarray):
+        self.coordinates = coordinates
+        minimum = coordinates.min(axis=0)
+        extent = coordinates.max(axis=0) - minimum
+        cells_count = max(1, len(coordinates) // self.CITIES_PER_CELL)
+        # Cities on a line have no area, so the cells are at least long enough to cover the line with `cells_count` cells
+        self.cell_size = max(math.sqrt(extent[0] * extent[1] / cells_count), extent.max() / cells_count, 1e-9)
+
+        self.cells = ((coordinates - minimum) // self.cell_size).astype(np.intp)
+        self.width, self.height = (self.cells.max(axis=0) + 1).tolist()
+
+        # The cities sorted by cell (row by row) - the cities of cell `id` are order[starts[id]:starts[id + 1]]
+        cell_ids = self.cells[:, 1] * self.width + self.cells[:, 0]
+        self.order = np.argsort(cell_ids, kind="stable")
+        self.starts = np.searchsorted(cell_ids[self.order], np.arange(self.width * self.height + 1))
+
+    def get_nearest(self, city: int, count: int) -> np.ndarray:
+        """
+        :return: the `count` nearest cities to `city` (without it), the nearest first
+        """
+        cell_x, cell_y = self.cells[city].tolist()
+
+        for radius in itertools.count(1):
+            min_x, max_x = max(cell_x - radius, 0), min(cell_x + radius, self.width - 1)
+            min_y, max_y = max(cell_y - radius, 0), min(cell_y + radius, self.height - 1)
+            covers_all = min_x == 0 and min_y == 0 and max_x == self.width - 1 and max_y == self.height - 1
+
+            # The cells of a row of the square are consecutive, so every row is one slice
+            candidates = np.concatenate([
+                self.order[self.starts[row * self.width + min_x]:self.starts[row * self.width + max_x + 1]]
+                for row in range(min_y, max_y + 1)
+            ])
+            candidates = candidates[candidates != city]
+            if len(candidates) < count and not covers_all:
+                continue
+
+            differences = self.coordinates[candidates] - self.coordinates[city]
+            distances = np.sqrt((differences ** 2).sum(axis=1))
+            if len(candidates) > count:
+                nearest = np.argpartition(distances, count - 1)[:count]
+            else:
+                nearest = np.arange(len(candidates))
+            nearest = nearest[np.argsort(distances[nearest], kind="stable")]
+
+            # Every city closer than `radius` cells is in the square, so no city outside of it can be nearer
+            if covers_all or distances[nearest[-1]] <= radius * self.cell_size:
+                return candidates[nearest]
+
+    def get_neighbours(self, count: int) -> list:
+        """
+        :return: the `count` nearest cities of every city as lists
+        """
+        return [self.get_nearest(city, count).tolist() for city in range(len(self.coordinates))]
+
+
+class LocalSearch:
+    """
+    2-opt and Or-opt restricted to the nearest neighbours of every city, with don't-look bits - only the cities in the queue are
+    tried, and a city goes back to the queue only when one of its edges changes.
+
+    The routes are open paths, so they are searched as cycles through an extra city (number `len(cities)`) whose distance to every
+    city is 0 - its two edges are the ends of the path.
+    """
+    EPSILON = 1e-9
+    # The longest segment moved by Or-opt
+    OR_OPT_LENGTH = 3
+
+    def __init__(self, cities: Cities, neighbours: list):
+        self.xs = cities.coordinates[:, 0].tolist()
+        self.ys = cities.coordinates[:, 1].tolist()
+        self.end = len(cities)
+        # The extra city is at distance 0 from every city, so it is the nearest candidate of all of them - moving a city next to it
+        # makes the city an end of the path
+        self.candidates = [[self.end] + city_neighbours for city_neighbours in neighbours]
+
+    def distance(self, city_a: int, city_b: int) -> float:
+        if city_a == self.end or city_b == self.end:
+            return 0.0
+
+        return math.hypot(self.xs[city_a] - self.xs[city_b], self.ys[city_a] - self.ys[city_b])
+
+    def improve(self, route: np.ndarray, active_cities=None) -> np.ndarray:
+        """
+        Improves the route until no move of the active cities (all by default) shortens it
+
+        :return: the improved route
+        """
+        self.__tour = np.append(route, self.end)
+        self.__positions = np.empty(len(self.__tour), dtype=np.intp)
+        self.__positions[self.__tour] = np.arange(len(self.__tour))
+
+        self.__queue = deque(route.tolist() if active_cities is None else active_cities)
+        self.__queued = bytearray(len(self.__tour))
+        for city in self.__queue:
+            self.__queued[city] = 1
+
+        while self.__queue:
+            city = self.__queue.popleft()
+            self.__queued[city] = 0
+
+            if self.__two_opt(city) or self.__or_opt(city):
+                self.__activate(city)
+
+        # The path starts right after the extra city
+        end_position = int(self.__positions[self.end])
+        return np.concatenate((self.__tour[end_position + 1:], self.__tour[:end_position]))
+
+    def __activate(self, *cities: int):
+        for city in cities:
+            if city != self.end and not self.__queued[city]:
+                self.__queued[city] = 1
+                self.__queue.append(city)
+
+    def __next(self, city: int) -> int:
+        return int(self.__tour[(self.__positions[city] + 1) % len(self.__tour)])
+
+    def __previous(self, city: int) -> int:
+        return int(self.__tour[self.__positions[city] - 1])
+
+    def __reverse(self, from_city: int, to_city: int):
+        """
+        Reverses the part of the cycle from `from_city` forward to `to_city`, or the rest of the cycle when it is shorter (which
+        gives the same cycle in the other direction)
+        """
+        size = len(self.__tour)
+        start = int(self.__positions[from_city])
+        length = (int(self.__positions[to_city]) - start) % size + 1
+        if 2 * length > size:
+            start = (int(self.__positions[to_city]) + 1) % size
+            length = size - length
+
+        positions = (np.arange(length) + start) % size
+        cities = self.__tour[positions][::-1]
+        self.__tour[positions] = cities
+        self.__positions[cities] = positions
+
+    def __two_opt(self, city_a: int) -> bool:
+        """
+        Replaces an edge of `city_a` and an edge of one of its neighbours with the edge between them and the edge between their
+        old partners
+        """
+        for forward in (True, False):
+            city_b = self.__next(city_a) if forward else self.__previous(city_a)
+            distance_ab = self.distance(city_a, city_b)
+
+            for city_c in self.candidates[city_a]:
+                distance_ac = self.distance(city_a, city_c)
+                # The new edge must be shorter than the removed one for the move to gain anything
+                if distance_ac >= distance_ab:
+                    break
+
+                city_d = self.__next(city_c) if forward else self.__previous(city_c)
+                if city_c == city_b or city_d == city_a:
+                    continue
+
+                delta = distance_ac + self.distance(city_b, city_d) - distance_ab - self.distance(city_c, city_d)
+                if delta < -self.EPSILON:
+                    if forward:
+                        self.__reverse(city_b, city_c)
+                    else:
+                        self.__reverse(city_a, city_d)
+                    self.__activate(city_b, city_c, city_d)
+                    return True
+
+        return False
+
+    def __or_opt(self, city_a: int) -> bool:
+        """
+        Moves the segment of up to OR_OPT_LENGTH cities starting from `city_a` next to one of the neighbours of `city_a`, in
+        either direction
+        """
+        size = len(self.__tour)
+        start = int(self.__positions[city_a])
+        previous = self.__previous(city_a)
+
+        for length in range(1, min(self.OR_OPT_LENGTH, size - 3) + 1):
+            segment = self.__tour[(np.arange(length) + start) % size].tolist()
+            if self.end in segment:
+                break
+
+            last = segment[-1]
+            following = self.__next(last)
+            removal_gain = self.distance(previous, city_a) + self.distance(last, following) - self.distance(previous, following)
+            if removal_gain <= self.EPSILON:
+                continue
+
+            for city_c in self.candidates[city_a]:
+                if self.distance(city_a, city_c) >= removal_gain:
+                    break
+                if city_c in segment:
+                    continue
+
+                # Between city_c and the city after it, with city_a next to city_c
+                if city_c != previous:
+                    next_c = self.__next(city_c)
+                    delta = (
+                        self.distance(city_c, city_a) + self.distance(last, next_c) - self.distance(city_c, next_c) - removal_gain
+                    )
+                    if delta < -self.EPSILON:
+                        self.__move_segment(segment, city_c, after=True)
+                        self.__activate(previous, following, last, city_c, next_c)
+                        return True
+
+                # Between the city before city_c and city_c, reversed so that city_a is next to city_c
+                if city_c != following:
+                    previous_c = self.__previous(city_c)
+                    delta = (
+                        self.distance(previous_c, last) + self.distance(city_a, city_c) - self.distance(previous_c, city_c) - removal_gain
+                    )
+                    if delta < -self.EPSILON:
+                        self.__move_segment(segment[::-1], city_c, after=False)
+                        self.__activate(previous, following, last, city_c, previous_c)
+                        return True
+
+        return False
+
+    def __move_segment(self, segment: list, city: int, after: bool):
+        """
+        Moves the segment (in the given order) right after or right before `city`
+        """
+        rest = np.delete(self.__tour, self.__positions[segment])
+        index = int(np.flatnonzero(rest == city)[0]) + (1 if after else 0)
+
+        self.__tour = np.concatenate((rest[:index], segment, rest[index:]))
+        self.__positions[self.__tour] = np.arange(len(self.__tour))
+
+
+class Mutation:
+    # Swaps two cities
+    swap = 'swap'
+    # Reverses the part of the route between two cities (2-opt move)
+    reversal = 'reversal'
+    # Moves a city to another position
+    insertion = 'insertion'
+
+
 class Route:
-    def __init__(self, route: list):
+    def __init__(self, route: np.ndarray, cities: Cities):
+        """
+        :param route: the numbers of the cities (see `Cities`) in the order of visiting them
+        """
         self.route = route
+        self.cities = cities
 
     def __eq__(self, other):
         return self.fitness == other.fitness
@@ -90,18 +466,11 @@ class Route:
         return self.fitness > other.fitness
 
     def __str__(self):
-        return f"{str(self.fitness).zfill(22)} - {' -> '.join([str(city) for city in self.route])}"
+        return f"{str(self.fitness).zfill(22)} - {' -> '.join([str(self.cities[city]) for city in self.route])}"
 
     @cached_property
     def distance(self):
-        distance = 0.0  # -_-
-        for city_index in range(len(self.route) - 1):
-            from_city: City = self.route[city_index]
-            to_city: City = self.route[city_index + 1]
-
-            distance += from_city.distance(to_city)
-
-        return distance
+        return self.cities.get_route_distance(self.route)
 
     @cached_property
     def fitness(self):
@@ -119,37 +488,146 @@ class Route:
     def __add__(self, other):
         if not isinstance(other, Route):
             raise ValueError("other is not of type Route")
-        # Breed
+        # Breed - the child starts with a random cut of this route followed by the rest of the cities in the order of the other one
         length = len(self.route)
         cut_points = sorted([random.randrange(length), random.randrange(length)])
         cut = self.route[slice(*cut_points)]
-        child = cut + [x for x in other.route if x not in cut]
 
-        return Route(child)
+        # Which cities are in the cut, so that every city of the other route is checked in O(1)
+        in_cut = np.zeros(length, dtype=bool)
+        in_cut[cut] = True
+        child = np.concatenate((cut, other.route[~in_cut[other.route]]))
 
-    def mutate(self, mutation_rate: float):
+        return Route(child, self.cities)
+
+    @staticmethod
+    def breed(parents_a: list, parents_b: list, cut_points: list, cities: Cities) -> list:
+        """
+        Breeds every parent from `parents_a` with the parent at the same position in `parents_b` in one pass - the same as
+        `parent_a + parent_b` with the given (sorted) cut points, but with the children as rows of one matrix
+        """
+        routes_a = np.array([parent.route for parent in parents_a])
+        routes_b = np.array([parent.route for parent in parents_b])
+        children_count, length = routes_a.shape
+        # The cities of every child are looked up in one flat bitmap - the bitmap of child `i` starts at `i * length`
+        offsets = (np.arange(children_count) * length)[:, np.newaxis]
+        cut_starts, cut_ends = np.array(cut_points, dtype=np.intp).reshape(-1, 2).T
+
+        # Which positions of parent A are in its cut and which cities are in the cut of every child
+        positions = np.arange(length)
+        cut_mask = (positions >= cut_starts[:, np.newaxis]) & (positions < cut_ends[:, np.newaxis])
+        in_cut = np.zeros(children_count * length, dtype=bool)
+        in_cut[(routes_a + offsets).ravel()] = cut_mask.ravel()
+
+        # Every row takes the cut of parent A and the cities of parent B which are not in it - exactly `length` cities, which are
+        # selected in order
+        selected = np.concatenate((cut_mask, ~in_cut[routes_b + offsets]), axis=1)
+        children = np.concatenate((routes_a, routes_b), axis=1)[selected].reshape(children_count, length)
+
+        return [Route(child, cities) for child in children]
+
+    def mutate(self, mutation_rate: float, mutation: str = Mutation.swap):
         """
-        Mutation in this case will swap 2 cities
+        Mutation in this case will swap 2 cities (or reverse the route between them or move the first one to the position of the
+        second one)
         """
         if random.random() < mutation_rate:
             length = len(self.route)
             a = random.randrange(length)
             b = random.randrange(length)
-            self.route[a], self.route[b] = self.route[b], self.route[a]
+
+            if mutation == Mutation.swap:
+                self.swap(a, b)
+            elif mutation == Mutation.reversal:
+                self.reverse(min(a, b), max(a, b))
+            elif mutation == Mutation.insertion:
+                self.move(a, b)
+            else:
+                raise ValueError(f"Unknown mutation {mutation}")
+
+    def swap(self, a: int, b: int):
+        """
+        Swaps the cities at positions `a` and `b`
+        """
+        def change():
+            self.route[[a, b]] = self.route[[b, a]]
+
+        self.__change(change, [a - 1, a, b - 1, b], [a - 1, a, b - 1, b])
+
+    def reverse(self, start: int, end: int):
+        """
+        Reverses the cities from position `start` to position `end` (including it) - only the edges at both ends change
+        """
+        def change():
+            self.route[start:end + 1] = self.route[start:end + 1][::-1].copy()
+
+        self.__change(change, [start - 1, end], [start - 1, end])
+
+    def move(self, source: int, target: int):
+        """
+        Moves the city at position `source` to position `target`, shifting the cities between them by one
+        """
+        def change():
+            self.route = np.insert(np.delete(self.route, source), target, self.route[source])
+
+        if source < target:
+            self.__change(change, [source - 1, source, target], [source - 1, target - 1, target])
+        elif source > target:
+            self.__change(change, [target - 1, source - 1, source], [target - 1, target, source])
+
+    def __get_edges_distance(self, starts: set) -> float:
+        """
+        Sums the edges which start at the given positions (the ones out of the route are skipped)
+        """
+        return sum([
+            self.cities.get_distance(self.route[start], self.route[start + 1]) for start in starts if 0 <= start < len(self.route) - 1
+        ])
+
+    def __change(self, change, starts_before: list, starts_after: list):
+        """
+        Applies `change` to the route and updates its (cached) distance in O(1) - only the edges starting at `starts_before`
+        before the change are replaced by the edges starting at `starts_after` after it, all other edges stay the same
+        """
+        # The fitness follows the distance, so it is calculated again when it is needed
+        self.__dict__.pop("fitness", None)
+
+        if "distance" not in self.__dict__:
+            change()
+            return
+
+        removed = self.__get_edges_distance(set(starts_before))
+        change()
+        self.distance += self.__get_edges_distance(set(starts_after)) - removed
+
+
+class Mode:
+    # Only crossover and mutation, for up to 100 cities
+    genetic = 'genetic'
+    # Every child is improved with local search, for big instances
+    memetic = 'memetic'
 
 
 class Solution:
+    # None lifts the limit
+    MAX_CITIES_COUNT = 100
     POPULATION_SIZE = 100
     ELITISM_SIZE = 3  # Retain top N members from the previous generation to the next one
     MAX_GENERATIONS = 1000
     MUTATION_RATE = 0.05
+    MUTATION = Mutation.swap
 
-    def __init__(self, cities_count: int):
-        self.cities_count = cities_count
+    def __init__(self, cities_count: int, coordinates: np.ndarray = None):
+        """
+        :param coordinates: the cities (see `load_instance`), random ones are generated when they are not given
+        """
+        self.cities_count = cities_count if coordinates is None else len(coordinates)
         self.current_generation = 0
-        self.cities = Grid.generate_cities(cities_count)
+        if coordinates is None:
+            self.cities = Cities.from_cities(list(Grid.generate_cities(cities_count)), distance_matrix=self.MAX_CITIES_COUNT is not None)
+        else:
+            self.cities = Cities(coordinates, distance_matrix=self.MAX_CITIES_COUNT is not None)
         #  Create init population and it's always stored as sorted list
-        self.population = sorted([Route(random.sample(self.cities, cities_count)) for _ in range(self.POPULATION_SIZE)], reverse=True)
+        self.population = sorted([self.get_initial_route() for _ in range(self.POPULATION_SIZE)], reverse=True)
 
     def __next__(self):
         """
@@ -162,11 +640,17 @@ class Solution:
         mating_pool = self.population[:self.POPULATION_SIZE // 2]
         next_generation = self.population[:self.ELITISM_SIZE]
 
+        # The parents and the cut points are picked the same way as for `parent_a + parent_b`, but all children are bred at once
+        parents_a, parents_b, cut_points = [], [], []
         for _ in range(self.POPULATION_SIZE - self.ELITISM_SIZE):
             parent_a, parent_b = random.sample(mating_pool, 2)
-            next_generation.append(parent_a + parent_b)
+            parents_a.append(parent_a)
+            parents_b.append(parent_b)
+            cut_points.append(sorted([random.randrange(self.cities_count), random.randrange(self.cities_count)]))
+
+        next_generation += Route.breed(parents_a, parents_b, cut_points, self.cities)
 
-        self.population = sorted(next_generation, reverse=True)
+        self.population = next_generation
         self.mutate_population()
         self.current_generation += 1
         return self
@@ -174,9 +658,29 @@ class Solution:
     def __iter__(self):
         return self
 
+    def get_initial_route(self) -> Route:
+        return Route(np.array(random.sample(range(self.cities_count), self.cities_count), dtype=np.intp), self.cities)
+
+    def replace_worst(self, route: Route) -> bool:
+        """
+        Replaces the worst route of the population with `route` when it is better and not in the population yet
+
+        :return: whether the route was added
+        """
+        # Equal distances most probably mean equal routes, which would take the diversity out of the population
+        if route > self.population[-1] and all([route.distance != other.distance for other in self.population]):
+            self.population[-1] = route
+            self.population.sort(reverse=True)
+            return True
+
+        return False
+
     def mutate_population(self):
         for route in self.population:
-            route.mutate(self.MUTATION_RATE)
+            route.mutate(self.MUTATION_RATE, self.MUTATION)
+
+        # The mutated routes have new distances, so the population is sorted after the mutation
+        self.population.sort(reverse=True)
 
     @property
     def fittest_distance(self):
@@ -188,24 +692,277 @@ class Solution:
 
     @cities_count.setter
     def cities_count(self, val: int):
-        if not isinstance(val, int) or val < 0 or val > 100:
-            raise ValueError("city_count cannot be below 0 or more than 100")
+        if not isinstance(val, int) or val < 0:
+            raise ValueError("city_count cannot be below 0")
+        if self.MAX_CITIES_COUNT is not None and val > self.MAX_CITIES_COUNT:
+            raise ValueError(f"city_count cannot be more than {self.MAX_CITIES_COUNT}")
 
         self.__cities_count = val
 
 
-def solution(cities_count: int):
-    sol = Solution(cities_count)
-    prev = None
+class MemeticSolution(Solution):
+    """
+    Genetic algorithm for thousands of cities - the routes start as nearest neighbour routes and every route (including the
+    children) is improved with 2-opt and Or-opt over the nearest neighbours of the cities. Every generation breeds
+    CHILDREN_COUNT children, which replace the worst routes of the (small) population when they are better.
+    """
+    MAX_CITIES_COUNT = None
+    POPULATION_SIZE = 8
+    MAX_GENERATIONS = 100
+    CHILDREN_COUNT = 2
+    NEIGHBOURS_COUNT = 8
+
+    @cached_property
+    def neighbours(self) -> list:
+        return SpatialGrid(self.cities.coordinates).get_neighbours(min(self.NEIGHBOURS_COUNT, self.cities_count - 1))
+
+    @cached_property
+    def local_search(self) -> LocalSearch:
+        return LocalSearch(self.cities, self.neighbours)
+
+    def get_initial_route(self) -> Route:
+        """
+        Nearest neighbour route from a random city, improved with local search
+        """
+        if self.cities_count < 2:
+            return Route(np.arange(self.cities_count, dtype=np.intp), self.cities)
+
+        visited = np.zeros(self.cities_count, dtype=bool)
+        route = [random.randrange(self.cities_count)]
+        visited[route[0]] = True
+
+        for _ in range(self.cities_count - 1):
+            for city in self.neighbours[route[-1]]:
+                if not visited[city]:
+                    break
+            else:
+                # All neighbours are already visited, so the nearest of the rest is searched among all of them
+                unvisited = np.flatnonzero(~visited)
+                differences = self.cities.coordinates[unvisited] - self.cities.coordinates[route[-1]]
+                city = int(unvisited[np.argmin((differences ** 2).sum(axis=1))])
+
+            route.append(city)
+            visited[city] = True
+
+        return Route(self.local_search.improve(np.array(route, dtype=np.intp)), self.cities)
+
+    def __next__(self):
+        if self.current_generation > self.MAX_GENERATIONS:
+            raise StopIteration()
+
+        for _ in range(self.CHILDREN_COUNT):
+            parent_a, parent_b = random.sample(self.population, 2)
+            child = parent_a + parent_b
+            # Only the cities of the edges that the child has from neither parent need local search
+            child = Route(self.local_search.improve(child.route, self.get_new_edge_cities(child, [parent_a, parent_b])), self.cities)
+
+            self.replace_worst(child)
+
+        self.current_generation += 1
+        return self
+
+    @staticmethod
+    def get_new_edge_cities(child: Route, parents: list) -> list:
+        """
+        :return: the cities of the edges of the child which are in none of the parents
+        """
+        new_edges = np.ones(len(child.route) - 1, dtype=bool)
+        for parent in parents:
+            positions = np.empty(len(parent.route), dtype=np.intp)
+            positions[parent.route] = np.arange(len(parent.route))
+            # Two cities are an edge of the parent when they are next to each other in it
+            new_edges &= np.abs(positions[child.route[:-1]] - positions[child.route[1:]]) != 1
+
+        return np.unique(np.concatenate((child.route[:-1][new_edges], child.route[1:][new_edges]))).tolist()
+
+
+class Topology:
+    # Every island sends its migrants to the next one
+    ring = 'ring'
+    # Every island sends its migrants to all other islands
+    complete = 'complete'
+
+
+def get_migration_targets(topology: str, island: int, islands_count: int) -> list:
+    if topology == Topology.ring:
+        return [(island + 1) % islands_count] if islands_count > 1 else []
+    if topology == Topology.complete:
+        return [other for other in range(islands_count) if other != island]
+
+    raise ValueError(f"Unknown topology {topology}")
+
+
+def evolve_island(
+        island: int,
+        coordinates: np.ndarray,
+        mode: str,
+        seed: int,
+        inboxes: list,
+        targets: list,
+        migration_interval: int,
+        migrants_count: int,
+) -> tuple:
+    """
+    Evolves the population of one island in a worker process of `solve_islands`. Every `migration_interval` generations the
+    best `migrants_count` routes are sent to the inboxes of the `targets` and the routes in the inbox of this island replace the
+    worst ones of its population. The inbox is not waited for, so the islands never block each other.
+
+    :return: (best route as an array, list of (generation, min distance) for every improvement)
+    """
+    random.seed(seed)
+    sol = (MemeticSolution if mode == Mode.memetic else Solution)(len(coordinates), coordinates)
+    history = [(0, sol.fittest_distance)]
+
     for generation in sol:
-        if prev != generation.fittest_distance:
-            print("generation:", str(generation.current_generation).zfill(3), "min distance:", generation.fittest_distance)
-            prev = generation.fittest_distance
+        if generation.current_generation % migration_interval == 0:
+            migrants = [route.route for route in generation.population[:migrants_count]]
+            for target in targets:
+                inboxes[target].put(migrants)
+
+            try:
+                while True:
+                    for route in inboxes[island].get_nowait():
+                        generation.replace_worst(Route(route, generation.cities))
+            except queue.Empty:
+                pass
+
+        if generation.fittest_distance < history[-1][1]:
+            history.append((generation.current_generation, generation.fittest_distance))
+
+    return sol.population[0].route, history
+
+
+def solve_islands(
+        coordinates: np.ndarray,
+        mode: str = Mode.genetic,
+        islands_count: int = 4,
+        topology: str = Topology.ring,
+        migration_interval: int = 10,
+        migrants_count: int = 2,
+        seed: int = 0,
+) -> tuple:
+    """
+    Island model - evolves `islands_count` populations (seeded with `seed`, `seed` + 1, ...) of the same cities in separate
+    processes, which exchange their best routes through queues along the `topology`
+
+    :return: (best route, list of (generation, min distance) for every improvement of the best distance of all islands)
+    """
+    with multiprocessing.Manager() as manager, ProcessPoolExecutor(max_workers=islands_count) as executor:
+        inboxes = [manager.Queue() for _ in range(islands_count)]
+        futures = [
+            executor.submit(
+                evolve_island,
+                island,
+                coordinates,
+                mode,
+                seed + island,
+                inboxes,
+                get_migration_targets(topology, island, islands_count),
+                migration_interval,
+                migrants_count,
+            )
+            for island in range(islands_count)
+        ]
+        results = [future.result() for future in futures]
+
+    cities = Cities(coordinates, distance_matrix=False)
+    best_route = min([Route(route, cities) for route, _ in results], key=lambda route: route.distance)
+
+    history = []
+    for generation, distance in sorted([event for _, island_history in results for event in island_history]):
+        if not history or distance < history[-1][1]:
+            history.append((generation, distance))
+
+    return best_route, history
+
+
+def solution(
+        cities_count: int,
+        mode: str = Mode.genetic,
+        instance: str = None,
+        member: str = None,
+        optimal_distance: float = None,
+        islands_count: int = 1,
+        topology: str = Topology.ring,
+        migration_interval: int = 10,
+        migrants_count: int = 2,
+        seed: int = None,
+):
+    """
+    :param instance: path of the instance to solve instead of random cities (see `load_instance`)
+    :param optimal_distance: shown next to the distances, the known one for the instance by default
+    :param islands_count: evolve that many populations in parallel with `solve_islands` when it is more than 1
+    """
+    if seed is not None:
+        random.seed(seed)
+
+    coordinates = None
+    if instance is not None:
+        name, coordinates = load_instance(instance, member)
+        if optimal_distance is None:
+            optimal_distance = KNOWN_OPTIMAL_DISTANCES.get(name)
+        print("instance:", name, "cities:", len(coordinates), "optimal distance:", optimal_distance)
+
+    if islands_count > 1:
+        if coordinates is None:
+            # All islands solve the same cities
+            coordinates = Cities.from_cities(list(Grid.generate_cities(cities_count)), distance_matrix=False).coordinates
+        # Fixed seeds would evolve the same islands on every run, so a base seed is drawn when none is given
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        _, history = solve_islands(coordinates, mode, islands_count, topology, migration_interval, migrants_count, seed)
+    else:
+        sol = MemeticSolution(cities_count, coordinates) if mode == Mode.memetic else Solution(cities_count, coordinates)
+        history = ((generation.current_generation, generation.fittest_distance) for generation in sol)
+
+    prev = None
+    for current_generation, fittest_distance in history:
+        if prev != fittest_distance:
+            gap = []
+            if optimal_distance:
+                gap.append("({:.2f}% above the optimum)".format((fittest_distance / optimal_distance - 1) * 100))
+            print("generation:", str(current_generation).zfill(3), "min distance:", fittest_distance, *gap)
+            prev = fittest_distance
 
 
 def main():
-    cities_count = int(input("Input number cities: "))
-    solution(cities_count)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("cities_count", nargs="?", type=int, help="Number of cities, asked for when it is not given")
+    parser.add_argument("--mode", help="Which algorithm to use", choices=[Mode.genetic, Mode.memetic], default=Mode.genetic)
+    parser.add_argument("--instance", help="TSPLIB or coordinates file (or a .zip with them) to solve instead of random cities")
+    parser.add_argument("--member", help="Which file of the --instance archive to read")
+    parser.add_argument("--optimal-distance", type=float, help="Known optimal distance of the instance")
+    parser.add_argument("--islands", type=int, default=1, help="Populations evolved in parallel processes")
+    parser.add_argument(
+        "--topology",
+        help="Where the islands send their migrants",
+        choices=[Topology.ring, Topology.complete],
+        default=Topology.ring,
+    )
+    parser.add_argument("--migration-interval", type=int, default=10, help="Generations between two migrations")
+    parser.add_argument("--migrants", type=int, default=2, help="Best routes sent by an island on every migration")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.instance is not None:
+        cities_count = None
+    elif args.cities_count is not None:
+        cities_count = args.cities_count
+    else:
+        cities_count = int(input("Input number cities: "))
+
+    solution(
+        cities_count,
+        mode=args.mode,
+        instance=args.instance,
+        member=args.member,
+        optimal_distance=args.optimal_distance,
+        islands_count=args.islands,
+        topology=args.topology,
+        migration_interval=args.migration_interval,
+        migrants_count=args.migrants,
+        seed=args.seed,
+    )
 
 
 if __name__ == '__main__':
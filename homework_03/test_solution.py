@@ -0,0 +1,200 @@
+import queue
+import random
+import zipfile
+
+import numpy as np
+import pytest
+
+from homework_03 import solution
+from homework_03.solution import (
+    DATA_PATH,
+    Cities,
+    City,
+    LocalSearch,
+    Mode,
+    Route,
+    Solution,
+    SpatialGrid,
+    Topology,
+    evolve_island,
+    get_migration_targets,
+    load_instance,
+)
+
+
+def get_cities(cities_count: int, distance_matrix: bool) -> Cities:
+    return Cities(np.random.default_rng(cities_count).uniform(0, 200, (cities_count, 2)), distance_matrix=distance_matrix)
+
+
+@pytest.mark.parametrize("distance_matrix", [True, False])
+def test_cities_distances_match_city_distance(distance_matrix):
+    cities = get_cities(15, distance_matrix)
+    route = np.random.default_rng(2021).permutation(15)
+
+    for city_a in range(15):
+        for city_b in range(15):
+            assert cities.get_distance(city_a, city_b) == pytest.approx(cities[city_a].distance(cities[city_b]))
+    assert cities.get_route_distance(route) == pytest.approx(sum([
+        cities[city_a].distance(cities[city_b]) for city_a, city_b in zip(route[:-1], route[1:])
+    ]))
+    assert isinstance(cities[0], City) and len(cities) == 15
+
+
+@pytest.mark.parametrize("distance_matrix", [True, False])
+@pytest.mark.parametrize("operator", ["swap", "reverse", "move"])
+def test_route_distance_follows_every_change(operator, distance_matrix):
+    random.seed(2021)
+    cities = get_cities(20, distance_matrix)
+    route = Route(np.arange(20), cities)
+
+    for _ in range(200):
+        a, b = sorted([random.randrange(20), random.randrange(20)])
+        # The distance is cached before the change, so that it is updated by the delta of the changed edges
+        assert route.distance == pytest.approx(cities.get_route_distance(route.route))
+        getattr(route, operator)(a, b)
+
+        assert route.distance == pytest.approx(cities.get_route_distance(route.route))
+        assert route.fitness == pytest.approx(1 / cities.get_route_distance(route.route))
+        assert sorted(route.route) == list(range(20))
+
+
+def test_population_is_sorted_by_real_distance_after_next():
+    random.seed(2021)
+    solution = Solution(30)
+
+    for _ in range(5):
+        next(solution)
+        distances = [solution.cities.get_route_distance(route.route) for route in solution.population]
+
+        assert [route.distance for route in solution.population] == pytest.approx(distances)
+        assert distances == sorted(distances)
+
+
+def test_breed_matches_add_with_the_same_cut_points():
+    cities = get_cities(30, True)
+    rng = np.random.default_rng(2021)
+    parents_a = [Route(rng.permutation(30), cities) for _ in range(20)]
+    parents_b = [Route(rng.permutation(30), cities) for _ in range(20)]
+
+    random.seed(2021)
+    children = [parent_a + parent_b for parent_a, parent_b in zip(parents_a, parents_b)]
+    # `+` picks its cut points with the same two calls
+    random.seed(2021)
+    cut_points = [sorted([random.randrange(30), random.randrange(30)]) for _ in range(20)]
+
+    bred = Route.breed(parents_a, parents_b, cut_points, cities)
+
+    assert [child.route.tolist() for child in bred] == [child.route.tolist() for child in children]
+    assert all([sorted(child.route.tolist()) == list(range(30)) for child in bred])
+
+
+def test_spatial_grid_finds_the_nearest_cities():
+    cities = get_cities(300, True)
+    grid = SpatialGrid(cities.coordinates)
+
+    for city in range(0, 300, 7):
+        expected = np.argsort(cities.distances[city], kind="stable")[1:9]
+        assert cities.distances[city][grid.get_nearest(city, 8)] == pytest.approx(cities.distances[city][expected])
+
+
+@pytest.mark.parametrize("active", [False, True])
+def test_local_search_never_makes_a_route_longer(active):
+    cities = get_cities(300, False)
+    local_search = LocalSearch(cities, SpatialGrid(cities.coordinates).get_neighbours(8))
+    rng = np.random.default_rng(2021)
+
+    for _ in range(5):
+        route = rng.permutation(300)
+        active_cities = rng.choice(300, 20, replace=False).tolist() if active else None
+        improved = local_search.improve(route, active_cities)
+
+        assert sorted(improved.tolist()) == list(range(300))
+        assert cities.get_route_distance(improved) <= cities.get_route_distance(route) + LocalSearch.EPSILON
+
+
+TSP_FILE = """NAME: square
+TYPE: TSP
+DIMENSION: 4
+EDGE_WEIGHT_TYPE: EUC_2D
+NODE_COORD_SECTION
+1 0 0
+2 0 10
+3 10.5 10
+4 1.0e1 0
+EOF
+"""
+
+
+def test_load_instance_from_tsp_file(tmp_path):
+    path = tmp_path / "square.tsp"
+    path.write_text(TSP_FILE)
+
+    name, coordinates = load_instance(str(path))
+
+    assert name == "square"
+    assert coordinates.tolist() == [[0, 0], [0, 10], [10.5, 10], [10, 0]]
+
+
+def test_load_instance_from_zip_member(tmp_path):
+    path = tmp_path / "instances.zip"
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("README.txt", "not an instance")
+        archive.write(DATA_PATH / "uk12_xy.csv", "UK_TSP/uk12_xy.csv")
+        archive.writestr("UK_TSP/square.tsp", TSP_FILE)
+
+    # Without a member the first instance of the archive is read
+    assert load_instance(str(path))[0] == "uk12"
+    name, coordinates = load_instance(str(path), "UK_TSP/square.tsp")
+
+    assert name == "square"
+    assert coordinates.tolist() == [[0, 0], [0, 10], [10.5, 10], [10, 0]]
+
+
+def test_load_instance_rejects_unsupported_edge_weight_type(tmp_path):
+    path = tmp_path / "geo.tsp"
+    path.write_text(TSP_FILE.replace("EUC_2D", "GEO"))
+
+    with pytest.raises(ValueError):
+        load_instance(str(path))
+
+
+def test_load_instance_from_coordinates_file():
+    name, coordinates = load_instance(str(DATA_PATH / "uk12_xy.csv"))
+
+    assert name == "uk12"
+    assert coordinates.shape == (12, 2)
+
+
+def test_migration_targets():
+    assert get_migration_targets(Topology.ring, 3, 4) == [0]
+    assert get_migration_targets(Topology.ring, 0, 1) == []
+    assert get_migration_targets(Topology.complete, 1, 4) == [0, 2, 3]
+    with pytest.raises(ValueError):
+        get_migration_targets("star", 0, 4)
+
+
+def test_evolve_island_exchanges_migrants(monkeypatch):
+    monkeypatch.setattr(Solution, "MAX_GENERATIONS", 20)
+    coordinates = get_cities(20, True).coordinates
+    inboxes = [queue.Queue(), queue.Queue()]
+    # The routes waiting in the inbox of the island replace its worst ones on the first migration
+    inboxes[0].put([np.arange(20)])
+
+    route, history = evolve_island(0, coordinates, Mode.genetic, 2021, inboxes, [1], 5, 2)
+
+    assert inboxes[0].empty()
+    migrations = [inboxes[1].get_nowait() for _ in range(inboxes[1].qsize())]
+    assert len(migrations) == 4 and all([len(migrants) == 2 for migrants in migrations])
+    assert sorted(route.tolist()) == list(range(20))
+    assert [distance for _, distance in history] == sorted([distance for _, distance in history], reverse=True)
+
+
+def test_solution_draws_the_island_seeds_when_none_is_given(monkeypatch):
+    seeds = []
+    monkeypatch.setattr(solution, "solve_islands", lambda *args: seeds.append(args[-1]) or (None, []))
+
+    solution.solution(10, islands_count=2)
+    solution.solution(10, islands_count=2)
+    solution.solution(10, islands_count=2, seed=7)
+
+    assert seeds[0] != seeds[1] and seeds[2] == 7